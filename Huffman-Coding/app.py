@@ -1,148 +1,8 @@
 import streamlit as st
-import heapq
 import os
 import io
 
-class HuffmanCoding:
-    class HeapNode:
-        def __init__(self, char, freq):
-            self.char = char
-            self.freq = freq
-            self.left = None
-            self.right = None
-
-        def __lt__(self, other):
-            return self.freq < other.freq
-
-        def __eq__(self, other):
-            if other is None:
-                return False
-            if not isinstance(other, HuffmanCoding.HeapNode):
-                return False
-            return self.freq == other.freq
-
-    def make_frequency_dict(self, text):
-        frequency = {}
-        for character in text:
-            if character not in frequency:
-                frequency[character] = 0
-            frequency[character] += 1
-        return frequency
-
-    def make_heap(self, frequency):
-        for key in frequency:
-            node = self.HeapNode(key, frequency[key])
-            heapq.heappush(self.heap, node)
-
-    def merge_nodes(self):
-        while len(self.heap) > 1:
-            node1 = heapq.heappop(self.heap)
-            node2 = heapq.heappop(self.heap)
-
-            merged = self.HeapNode(None, node1.freq + node2.freq)
-            merged.left = node1
-            merged.right = node2
-
-            heapq.heappush(self.heap, merged)
-
-    def make_codes_helper(self, root, current_code):
-        if root is None:
-            return
-
-        if root.char is not None:
-            self.codes[root.char] = current_code
-            self.reverse_mapping[current_code] = root.char
-            return
-
-        self.make_codes_helper(root.left, current_code + "0")
-        self.make_codes_helper(root.right, current_code + "1")
-
-    def make_codes(self):
-        root = heapq.heappop(self.heap)
-        current_code = ""
-        self.make_codes_helper(root, current_code)
-
-    def get_encoded_text(self, text):
-        encoded_text = ""
-        for character in text:
-            encoded_text += self.codes[character]
-        return encoded_text
-
-    def pad_encoded_text(self, encoded_text):
-        extra_padding = 8 - len(encoded_text) % 8
-        for i in range(extra_padding):
-            encoded_text += "0"
-
-        padded_info = "{0:08b}".format(extra_padding)
-        encoded_text = padded_info + encoded_text
-        return encoded_text
-
-    def get_byte_array(self, padded_encoded_text):
-        if len(padded_encoded_text) % 8 != 0:
-            print("Encoded text not padded properly")
-            exit(0)
-
-        b = bytearray()
-        for i in range(0, len(padded_encoded_text), 8):
-            byte = padded_encoded_text[i:i + 8]
-            b.append(int(byte, 2))
-        return b
-
-    def compress(self, file_content):
-        self.heap = []
-        self.codes = {}
-        self.reverse_mapping = {}
-
-        frequency = self.make_frequency_dict(file_content)
-        self.make_heap(frequency)
-        self.merge_nodes()
-        self.make_codes()
-
-        encoded_text = self.get_encoded_text(file_content)
-        padded_encoded_text = self.pad_encoded_text(encoded_text)
-
-        byte_array = self.get_byte_array(padded_encoded_text)
-
-        with io.BytesIO() as compressed_file:
-            compressed_file.write(byte_array)
-            return compressed_file.getvalue()
-
-    def remove_padding(self, padded_encoded_text):
-        padded_info = padded_encoded_text[:8]
-        extra_padding = int(padded_info, 2)
-
-        padded_encoded_text = padded_encoded_text[8:]
-        encoded_text = padded_encoded_text[:-1 * extra_padding]
-
-        return encoded_text
-
-    def decode_text(self, encoded_text):
-        current_code = ""
-        decoded_text = ""
-
-        for bit in encoded_text:
-            current_code += bit
-            if current_code in self.reverse_mapping:
-                character = self.reverse_mapping[current_code]
-                decoded_text += character
-                current_code = ""
-
-        return decoded_text
-
-    def decompress(self, file_content):
-        self.heap = []
-        self.codes = {}
-        self.reverse_mapping = {}
-
-        bit_string = ""
-        for byte in file_content:
-            bits = bin(byte)[2:].rjust(8, '0')
-            bit_string += bits
-
-        encoded_text = self.remove_padding(bit_string)
-        decompressed_text = self.decode_text(encoded_text)
-        return decompressed_text
-
+from huffman import HuffmanCoding
 
 def main():
     st.title("Huffman Coding Compression and Decompression")
@@ -159,7 +19,9 @@ def main():
 
             if compression_button:
                 huffman_coding = HuffmanCoding()
-                compressed_file_content = huffman_coding.compress(uploaded_file.read())
+                with io.BytesIO() as compressed_file:
+                    huffman_coding.compress_stream(uploaded_file, compressed_file)
+                    compressed_file_content = compressed_file.getvalue()
 
                 # Display the download button for the in-memory compressed file
                 download_button = st.download_button(
@@ -179,7 +41,13 @@ def main():
 
             if decompression_button:
                 huffman_coding = HuffmanCoding()
-                decompressed_text = huffman_coding.decompress(uploaded_file.read())
+                try:
+                    with io.BytesIO() as decompressed_file:
+                        huffman_coding.decompress_stream(uploaded_file, decompressed_file)
+                        decompressed_text = decompressed_file.getvalue()
+                except ValueError as e:
+                    st.error(f"Cannot decompress {uploaded_file.name}: {e}")
+                    return
 
                 # Display the download button for the in-memory decompressed file
                 download_button = st.download_button(
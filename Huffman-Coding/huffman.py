@@ -0,0 +1,296 @@
+"""Huffman compression of byte streams in bounded memory.
+
+    python huffman.py compress big.log big.huf
+    python huffman.py decompress big.huf big.log
+
+Compression reads its input twice, a chunk at a time: once to count byte
+frequencies, once to encode each chunk straight into packed bits.  A
+compressed file starts with the original size and the code length of
+each byte value; the codes themselves are canonical, so they are rebuilt
+from the lengths.  Decompression reads the packed bytes directly: the
+next TABLE_BITS bits index a table holding every whole code they start
+with, already decoded, and only codes longer than that are finished by
+canonical decoding.  Memory is a small multiple of the chunk size plus
+the code tables, however large the file.
+"""
+import argparse
+import heapq
+import io
+import struct
+import sys
+import time
+
+import numpy as np
+
+MAGIC = b"HUF1"
+# magic, original size in bytes, code length of each byte value (0 = absent)
+HEADER = struct.Struct(">4sQ256B")
+CHUNK_SIZE = 1 << 20
+# bits indexing the decoding table: 16384 entries, each up to TABLE_BITS codes
+TABLE_BITS = 14
+TABLE_MASK = (1 << TABLE_BITS) - 1
+
+class HuffmanCoding:
+    class HeapNode:
+        def __init__(self, char, freq):
+            self.char = char
+            self.freq = freq
+            self.left = None
+            self.right = None
+
+        def __lt__(self, other):
+            return self.freq < other.freq
+
+        def __eq__(self, other):
+            if other is None:
+                return False
+            if not isinstance(other, HuffmanCoding.HeapNode):
+                return False
+            return self.freq == other.freq
+
+    def __init__(self, chunk_size=CHUNK_SIZE):
+        self.chunk_size = chunk_size
+
+    def make_frequency_dict(self, src):
+        """Count of each byte value in src, read a chunk at a time."""
+        counts = np.zeros(256, dtype=np.int64)
+        while chunk := src.read(self.chunk_size):
+            counts += np.bincount(np.frombuffer(chunk, dtype=np.uint8), minlength=256)
+        return {byte: int(n) for byte, n in enumerate(counts) if n}
+
+    def make_heap(self, frequency):
+        for key in frequency:
+            node = self.HeapNode(key, frequency[key])
+            heapq.heappush(self.heap, node)
+
+    def merge_nodes(self):
+        while len(self.heap) > 1:
+            node1 = heapq.heappop(self.heap)
+            node2 = heapq.heappop(self.heap)
+
+            merged = self.HeapNode(None, node1.freq + node2.freq)
+            merged.left = node1
+            merged.right = node2
+
+            heapq.heappush(self.heap, merged)
+
+    def make_lengths_helper(self, root, depth):
+        if root is None:
+            return
+
+        if root.char is not None:
+            # a lone symbol still needs one bit
+            self.lengths[root.char] = max(depth, 1)
+            return
+
+        self.make_lengths_helper(root.left, depth + 1)
+        self.make_lengths_helper(root.right, depth + 1)
+
+    def make_codes(self, frequency):
+        """Code length of each byte value, from a Huffman tree of frequency."""
+        self.heap = []
+        self.lengths = [0] * 256
+        self.make_heap(frequency)
+        self.merge_nodes()
+        if self.heap:
+            self.make_lengths_helper(heapq.heappop(self.heap), 0)
+        self.codes = canonical_codes(self.lengths)
+
+    def make_bit_rows(self):
+        """Each byte value's code as a row of bits, and which bits of the row are used."""
+        width = max(max(self.lengths), 1)
+        self.bit_rows = np.zeros((256, width), dtype=np.uint8)
+        for byte, (code, n) in enumerate(self.codes):
+            for j in range(n):
+                self.bit_rows[byte, j] = code >> (n - 1 - j) & 1
+        self.bit_used = np.arange(width) < np.array(self.lengths)[:, None]
+
+    def encode_chunk(self, chunk, pending):
+        """(packed bytes, leftover bits) of pending bits followed by chunk's codes."""
+        symbols = np.frombuffer(chunk, dtype=np.uint8)
+        # rows are taken in order, so the used bits come out as the codes end to end
+        bits = np.take(self.bit_rows, symbols, axis=0)[np.take(self.bit_used, symbols, axis=0)]
+        bits = np.concatenate((pending, bits))
+        full = len(bits) // 8 * 8
+        return np.packbits(bits[:full]).tobytes(), bits[full:]
+
+    def compress_stream(self, src, dst):
+        """Compress seekable binary file src into dst; returns the bytes written."""
+        start = src.tell()
+        frequency = self.make_frequency_dict(src)
+        self.make_codes(frequency)
+        self.make_bit_rows()
+        written = dst.write(HEADER.pack(MAGIC, sum(frequency.values()), *self.lengths))
+        src.seek(start)
+        # a byte expands to a row of bits while encoding: read less when rows are long
+        step = max(1, self.chunk_size * 8 // self.bit_rows.shape[1])
+        pending = np.empty(0, dtype=np.uint8)
+        while chunk := src.read(step):
+            packed, pending = self.encode_chunk(chunk, pending)
+            written += dst.write(packed)
+        if len(pending):
+            written += dst.write(np.packbits(pending).tobytes())
+        return written
+
+    def read_header(self, src):
+        """Original size from src's header, with the codes set up to decode."""
+        header = src.read(HEADER.size)
+        if len(header) < HEADER.size or header[:4] != MAGIC:
+            raise ValueError("not a Huffman-compressed file")
+        _, size, *self.lengths = HEADER.unpack(header)
+        self.codes = canonical_codes(self.lengths)
+        return size
+
+    def make_decode_table(self):
+        """Lookup table indexed by the next TABLE_BITS bits of input.
+
+        Each entry is (bytes, bits, count): every whole code at the start of
+        those bits, decoded, how many bits they take and how many codes they
+        are.  (b"", 0, 0) means the first code is longer than TABLE_BITS and
+        decode_symbol must finish it.
+        """
+        self.first, self.count, self.symbols = canonical_decoding(self.lengths)
+        top = max(self.lengths)
+        table = []
+        for index in range(1 << TABLE_BITS):
+            run, used = bytearray(), 0
+            while True:
+                left = TABLE_BITS - used
+                try:
+                    byte, n = self.decode_symbol(index & (1 << left) - 1, left, 1, min(left, top))
+                except ValueError:
+                    break
+                run.append(byte)
+                used += n
+            table.append((bytes(run), used, len(run)))
+        return table
+
+    def decode_symbol(self, bits, nbits, shortest, longest):
+        """(byte, length) of the code at the start of bits, an nbits-wide
+        integer, trying code lengths shortest..longest."""
+        for n in range(shortest, min(longest, nbits) + 1):
+            i = (bits >> (nbits - n)) - self.first[n]
+            if 0 <= i < self.count[n]:
+                return self.symbols[n][i], n
+        raise ValueError("compressed data is corrupt")
+
+    def decode_chunks(self, src):
+        """Yield the decompressed bytes of src, one chunk of input at a time."""
+        remaining = self.read_header(src)
+        table = self.make_decode_table()
+        top = max(self.lengths, default=0)
+        # bits held before each lookup: a table index, or the longest code
+        need = max(TABLE_BITS, top)
+        shortest = min((n for n in self.lengths if n), default=1)
+        acc = nbits = 0
+        # input is taken 32 bits at a time, and a lookup only ever sees bits
+        # that were read: the last few, fewer than need, go to the tail loop
+        step = max(4, self.chunk_size // 4 * 4)
+        while remaining and (chunk := src.read(step)):
+            whole = len(chunk) // 4 * 4
+            # room for every code the chunk can hold, and what one last
+            # table entry may add past them
+            end = min(remaining, (nbits + 8 * len(chunk)) // shortest)
+            out = bytearray(end + TABLE_BITS)
+            pos = 0
+            for word in np.frombuffer(chunk, dtype=">u4", count=whole // 4).tolist():
+                acc = acc << 32 | word
+                nbits += 32
+                while nbits >= need:
+                    run, n, k = table[acc >> (nbits - TABLE_BITS) & TABLE_MASK]
+                    if not n:
+                        bits = acc >> (nbits - top) & (1 << top) - 1
+                        symbol, n = self.decode_symbol(bits, top, TABLE_BITS + 1, top)
+                        run, k = bytes((symbol,)), 1
+                    out[pos:pos + k] = run
+                    pos += k
+                    nbits -= n
+                acc &= (1 << nbits) - 1
+                if pos >= end:
+                    break
+            else:
+                # a short read's odd bytes wait in acc for the next words
+                for byte in chunk[whole:]:
+                    acc = acc << 8 | byte
+                    nbits += 8
+            pos = min(pos, end)
+            remaining -= pos
+            yield bytes(memoryview(out)[:pos])
+        # the last codes, fewer than need bits, decoded one at a time
+        tail = bytearray()
+        while remaining and nbits:
+            bits = acc << (top - nbits) if top > nbits else acc >> (nbits - top)
+            symbol, n = self.decode_symbol(bits, top, 1, top)
+            if n > nbits:
+                break
+            tail.append(symbol)
+            remaining -= 1
+            nbits -= n
+            acc &= (1 << nbits) - 1
+        if tail:
+            yield bytes(tail)
+        if remaining:
+            raise ValueError(f"compressed data ends {remaining} bytes short")
+
+    def decompress_stream(self, src, dst):
+        """Decompress src into dst; returns the bytes written."""
+        return sum(dst.write(part) for part in self.decode_chunks(src))
+
+    def compress(self, file_content):
+        with io.BytesIO() as compressed_file:
+            self.compress_stream(io.BytesIO(file_content), compressed_file)
+            return compressed_file.getvalue()
+
+    def decompress(self, file_content):
+        return b"".join(self.decode_chunks(io.BytesIO(file_content)))
+
+def canonical_codes(lengths):
+    """(code, length) per byte value: shorter codes first, ties by value."""
+    codes = [(0, 0)] * 256
+    code = prev = 0
+    for n, byte in sorted((n, byte) for byte, n in enumerate(lengths) if n):
+        code <<= n - prev
+        codes[byte] = (code, n)
+        code += 1
+        prev = n
+    return codes
+
+def canonical_decoding(lengths):
+    """(first code, code count, symbols) per code length, for decoding canonical codes."""
+    top = max(lengths, default=0)
+    count = [0] * (top + 2)
+    symbols = [[] for _ in range(top + 2)]
+    for n, byte in sorted((n, byte) for byte, n in enumerate(lengths) if n):
+        count[n] += 1
+        symbols[n].append(byte)
+    first = [0] * (top + 2)
+    code = 0
+    for n in range(1, top + 2):
+        code = (code + count[n - 1]) << 1
+        first[n] = code
+    return first, count, symbols
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Huffman-compress or decompress a file.")
+    parser.add_argument('operation', choices=('compress', 'decompress'))
+    parser.add_argument('input')
+    parser.add_argument('output')
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help="bytes read at a time")
+    args = parser.parse_args(argv)
+    coder = HuffmanCoding(args.chunk_size)
+    start = time.perf_counter()
+    with open(args.input, 'rb') as src, open(args.output, 'wb') as dst:
+        try:
+            if args.operation == 'compress':
+                coder.compress_stream(src, dst)
+            else:
+                coder.decompress_stream(src, dst)
+        except ValueError as e:
+            sys.exit(f"cannot {args.operation} {args.input}: {e}")
+        size_in, size_out = src.tell(), dst.tell()
+    elapsed = time.perf_counter() - start
+    print(f"{args.input} ({size_in} bytes) -> {args.output} ({size_out} bytes) in {elapsed:.2f}s, "
+          f"{max(size_in, size_out) / 1e6 / elapsed:.1f} MB/s")
+
+if __name__ == "__main__":
+    main()
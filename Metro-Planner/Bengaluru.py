@@ -1,25 +1,22 @@
 import os
 from pathlib import Path
-import difflib
 import streamlit as st
 import pandas as pd
-from PIL import Image
-from graph import bengaluru  # <-- keep your full, updated adjacency dict here
+from lines import alternatives
+from loaders import PageTimer, load_image, load_map, network_stats, station_names
+from metrics import calc_distance_km, calc_journey_fare, calc_time_minutes
+from station_search import station_index
+
+timer = PageTimer("Bengaluru")
 
 # -----------------------------
-# Paths & Safe Image Loading
+# Paths
 # -----------------------------
 BASE_DIR = Path(__file__).parent
 icon_path = BASE_DIR / "images" / "icon.png"
 metro_logo_path = BASE_DIR / "images" / "namma_metro.png"
 metro_map_path = BASE_DIR / "images" / "bengaluru_map.jpg"
 
-def load_image_safe(path: Path):
-    try:
-        return Image.open(path)
-    except Exception:
-        return None
-
 # -----------------------------
 # Streamlit Page Config
 # -----------------------------
@@ -37,7 +34,7 @@ st.set_page_config(
 # -----------------------------
 # Sidebar Branding
 # -----------------------------
-logo = load_image_safe(metro_logo_path)
+logo = load_image(metro_logo_path.name)
 if logo is not None:
     st.sidebar.image(logo, use_container_width=True)
 else:
@@ -85,7 +82,8 @@ st.markdown(
     unsafe_allow_html=True,
 )
 
-city_map = load_image_safe(metro_map_path)
+# decoded once per process, from a display-sized copy
+city_map = load_map(metro_map_path.name)
 if city_map is not None:
     st.image(city_map, use_container_width=True)
 else:
@@ -99,97 +97,29 @@ st.markdown(
 # -----------------------------
 # Station Helpers
 # -----------------------------
-all_stations = sorted(bengaluru.keys())
+# stations of the undirected, de-duplicated graph;
+# keep your full, updated adjacency dict in graph.py
+all_stations = station_names("bengaluru")
 
-def closest_station_name(user_text: str, cutoff: float = 0.65):
+def closest_station_name(user_text: str):
     """Return the closest station name for a possibly mistyped input."""
     if not user_text:
         return None
-    matches = difflib.get_close_matches(user_text.upper(), all_stations, n=1, cutoff=cutoff)
-    return matches[0] if matches else None
-
-def is_interchange(station: str) -> bool:
-    """Heuristic: degree >= 3 is likely an interchange."""
-    # Some known interchanges might have degree==2 due to data specifics; keep a manual allow-list too.
-    manual = {
-        "NADAPRABHU KEMPEGOWDA STATION, MAJESTIC",
-    "RASHTREEYA VIDYALAYA ROAD",
-    "BYAPPANAHALLI"
-    }
-    deg = len(bengaluru.get(station, []))
-    return deg >= 3 or station in manual
-
-INTERCHANGES = {
-    "NADAPRABHU KEMPEGOWDA STATION, MAJESTIC",
-    "RASHTREEYA VIDYALAYA ROAD",
-    "BYAPPANAHALLI"
+    # prebuilt once per process; also knows names like "majestic" and "rv road"
+    return station_index("bengaluru").best(user_text)
+
+# row colours (background, text) for legs on each line in graph.py
+LINE_COLOURS = {
+    "Green": ("#16a34a", "white"),
+    "Purple": ("#7e22ce", "white"),
+    "Yellow": ("#eab308", "black"),
 }
 
-# -----------------------------
-# Shortest Path (BFS)
-# -----------------------------
-from collections import deque
-
-def shortest_path(graph: dict, start: str, end: str):
-    """Unweighted shortest path via BFS."""
-    if start == end:
-        return [start]
-    visited = set([start])
-    queue = deque([[start]])
-    while queue:
-        path = queue.popleft()
-        node = path[-1]
-        for nei in graph.get(node, []):
-            if nei not in visited:
-                visited.add(nei)
-                new_path = path + [nei]
-                if nei == end:
-                    return new_path
-                queue.append(new_path)
-    return None
-
 # -----------------------------
 # Metrics: Distance, Time, Fare
 # -----------------------------
-STATION_DISTANCE_KM = 1.2    # avg spacing assumption
-AVERAGE_SPEED_KMPH = 32      # typical metro average incl. dwell
-MIN_DWELL_SEC = 25           # per stop average dwell time
-
-def calc_distance_km(path):
-    return max(0, (len(path) - 1)) * STATION_DISTANCE_KM
-
-def calc_time_minutes(path):
-    # run time: distance/speed + dwell_time*(stops-1)
-    dist = calc_distance_km(path)
-    run_minutes = (dist / AVERAGE_SPEED_KMPH) * 60.0
-    dwell_minutes = max(0, (len(path) - 1)) * (MIN_DWELL_SEC / 60.0)
-    return int(round(run_minutes + dwell_minutes))
-
-def calc_fare(distance_km: float) -> int:
-    # Simple slab; adjust as needed to match current BMRCL fare matrix
-    if distance_km <= 2: return 10
-    elif distance_km <= 5: return 15
-    elif distance_km <= 10: return 25
-    elif distance_km <= 15: return 35
-    elif distance_km <= 20: return 45
-    else: return 60
-
-def calc_fare_splitted(path: list) -> int:
-    if not path:
-        return 0
-    total_fare = 0
-    segment = [path[0]]
-    for station in path[1:]:
-        segment.append(station)
-        if station in INTERCHANGES and station != path[-1]:
-            # Current segment ends here
-            km = calc_distance_km(segment)
-            total_fare += calc_fare(km)
-            segment = [station]
-    # Final segment
-    km = calc_distance_km(segment)
-    total_fare += calc_fare(km)
-    return total_fare
+# calc_distance_km, calc_time_minutes and calc_journey_fare live in
+# metrics.py, shared with the od_matrix.py batch tool
 
 # -----------------------------
 # UI Inputs (with fuzzy fix)
@@ -198,58 +128,84 @@ colA, colB = st.columns(2)
 with colA:
     source = st.selectbox("Source", all_stations, index=0, key="src_select")
 with colB:
-    dest = st.selectbox("Destination", all_stations, index=min(1, len(all_stations)-1), key="dst_select")
-
-# st.write("Or type to auto-correct a misspelled station (optional):")
-# colC, colD = st.columns(2)
-# with colC:
-#     typo_src = st.text_input("Source (free text)", placeholder="e.g., majestic")
-# with colD:
-#     typo_dst = st.text_input("Destination (free text)", placeholder="e.g., rv road")
-
-# fix_btn = st.button("Auto-correct typed names")
-# if fix_btn:
-#     c_src = closest_station_name(typo_src) if typo_src else None
-#     c_dst = closest_station_name(typo_dst) if typo_dst else None
-#     if c_src:
-#         source = c_src
-#         st.success(f"Source corrected to **{source}**")
-#     if c_dst:
-#         dest = c_dst
-#         st.success(f"Destination corrected to **{dest}**")
-#     if not c_src and typo_src:
-#         st.warning("Couldn’t find a close match for the typed source.")
-#     if not c_dst and typo_dst:
-#         st.warning("Couldn’t find a close match for the typed destination.")
+    # default set through session state, which the auto-correct below also writes
+    st.session_state.setdefault("dst_select", all_stations[min(1, len(all_stations)-1)])
+    dest = st.selectbox("Destination", all_stations, key="dst_select")
+
+st.write("Or type to auto-correct a misspelled station (optional):")
+colC, colD = st.columns(2)
+with colC:
+    typo_src = st.text_input("Source (free text)", placeholder="e.g., majestic", key="typo_src")
+with colD:
+    typo_dst = st.text_input("Destination (free text)", placeholder="e.g., rv road", key="typo_dst")
+
+def apply_typed_names():
+    # runs before the rerun, so the corrected names can still move the selectboxes
+    notes = []
+    for label, typed_key, select_key in (("Source", "typo_src", "src_select"), ("Destination", "typo_dst", "dst_select")):
+        typed = st.session_state.get(typed_key)
+        if not typed:
+            continue
+        match = closest_station_name(typed)
+        if match:
+            st.session_state[select_key] = match
+            notes.append(("success", f"{label} corrected to **{match}**"))
+        else:
+            notes.append(("warning", f"Couldn’t find a close match for the typed {label.lower()}."))
+    st.session_state["typed_notes"] = notes
+
+st.button("Auto-correct typed names", on_click=apply_typed_names)
+for kind, note in st.session_state.pop("typed_notes", []):
+    getattr(st, kind)(note)
 
 # -----------------------------
 # Find & Display Routes
 # -----------------------------
+OBJECTIVES = {"Fastest": "time", "Fewest changes": "transfers"}
+objective = st.radio("Optimise for", tuple(OBJECTIVES), horizontal=True)
+options = st.slider("Routes to compare", 1, 5, 3)
 go = st.button("Search Route 🔎")
 
-def style_route_df(df: pd.DataFrame):
+def style_legs_df(df: pd.DataFrame):
     def row_style(row):
-        station = row["Station"]
-        if station == source or station == dest:
-            return ["font-weight:700; background-color:#0ea5e9; color:white"] * len(row)
-        if is_interchange(station):
-            return ["background-color:#eab308; color:black; font-weight:600"] * len(row)
-        return [""] * len(row)
+        colours = LINE_COLOURS.get(row["Line"])
+        if colours is None:
+            return [""] * len(row)
+        return [f"background-color:{colours[0]}; color:{colours[1]}; font-weight:600"] * len(row)
 
     return df.style.apply(row_style, axis=1)
 
+def legs_df(legs):
+    return pd.DataFrame({
+        "Line": [line for line, _ in legs],
+        "From": [names[0] for _, names in legs],
+        "To": [names[-1] for _, names in legs],
+        "Stops": [len(names) - 1 for _, names in legs],
+    })
+
+def options_df(journeys):
+    return pd.DataFrame({
+        "Option": range(1, len(journeys) + 1),
+        "Via": [" → ".join(line for line, _ in legs) for _, legs, _, _ in journeys],
+        "Time (min)": [calc_time_minutes("bengaluru", legs) for _, legs, _, _ in journeys],
+        "Fare (₹)": [calc_journey_fare("bengaluru", legs) for _, legs, _, _ in journeys],
+        "Changes": [transfers for _, _, _, transfers in journeys],
+        "Stations": [len(path) for path, _, _, _ in journeys],
+    })
+
 if go:
     if source == dest:
         st.info("Source and destination are the same. Please pick different stations.")
     else:
-        path = shortest_path(bengaluru, source, dest)
-        if not path:
+        journeys = alternatives("bengaluru", source, dest, options, OBJECTIVES[objective])
+        if not journeys:
             st.error("No route found between the selected stations. Please verify station names.")
         else:
+            path, legs, _, transfers = journeys[0]
             # Metrics
-            distance_km = round(calc_distance_km(path), 2)
-            time_min = calc_time_minutes(path)
-            fare = calc_fare_splitted(path)
+            distance_km = round(calc_distance_km("bengaluru", path), 2)
+            time_min = calc_time_minutes("bengaluru", legs)
+            fare = calc_journey_fare("bengaluru", legs)
 
             st.markdown("<div class='metric-row'>", unsafe_allow_html=True)
             st.markdown(
@@ -266,21 +222,24 @@ if go:
             )
             st.markdown("</div>", unsafe_allow_html=True)
 
-            # Build dataframes
-            df_forward = pd.DataFrame({"#": range(1, len(path)+1), "Station": path})
-            df_return = df_forward.iloc[::-1].reset_index(drop=True)
-            df_return["#"] = range(1, len(df_return)+1)
+            # One row per leg rather than per station
+            return_legs = [(line, names[::-1]) for line, names in reversed(legs)]
 
             c1, c2 = st.columns(2)
             with c1:
                 st.subheader(f"{source} → {dest}")
-                st.dataframe(style_route_df(df_forward), use_container_width=True)
+                st.dataframe(style_legs_df(legs_df(legs)), use_container_width=True, hide_index=True)
             with c2:
                 st.subheader(f"{dest} → {source}")
-                st.dataframe(style_route_df(df_return), use_container_width=True)
+                st.dataframe(style_legs_df(legs_df(return_legs)), use_container_width=True, hide_index=True)
+
+            st.caption(f"{len(path)} stations  •  {transfers} change{'s' if transfers != 1 else ''}")
 
-            # Small legend
-            st.caption("🟦 start/end  •  🟨 interchange")
+            if len(journeys) > 1:
+                st.subheader("Other options")
+                st.dataframe(options_df(journeys), use_container_width=True, hide_index=True)
+            elif options > 1:
+                st.caption("No other route avoids repeating a station.")
 
 # -----------------------------
 # Safety: Warn if images missing in repo (Cloud gotchas)
@@ -295,4 +254,13 @@ if missing:
         "\n\nCommit & push these files so Streamlit Cloud can load them."
     )
 
+stats = network_stats("bengaluru")
+if stats["components"] > 1:
+    st.sidebar.warning(
+        f"The network splits into {stats['components']} disconnected parts "
+        f"(sizes {stats['sizes']}). Run `python graph_check.py` for details."
+    )
+
+timer.done()
+
 
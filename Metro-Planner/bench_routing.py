@@ -0,0 +1,264 @@
+"""Routing benchmarks on the city networks and synthetic ones.
+
+    python bench_routing.py                          # writes bench_results.json
+    python bench_routing.py --sizes 100 10000 --pairs 50 -o new.json --baseline old.json
+
+Every algorithm answers the same origin-destination pairs on each
+network: random pairs, and the two ends of a longest shortest path
+(found by a double BFS sweep) as the worst case.  Latency is timed
+without tracing; peak memory is a second, traced pass over the first
+few of the same pairs.  Setup (compiling, building tables) is reported
+on its own.
+
+legacy_dfs and legacy_bfs are the searches the pages first shipped with
+(Delhi.py's dfs and Bengaluru.py's shortest_path), kept here as the
+baseline.
+"""
+import argparse
+import json
+import math
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import deque
+from pathlib import Path
+
+from lines import LineGraph
+from registry import load_city
+from route_table import RouteTable, write_table
+from routing import CompiledGraph, Weights, fastest_path, shortest_path
+
+# dfs copies its path at every step and explores every simple path
+# shorter than the best so far: exponential on grids, quadratic on lines
+DFS_MAX_STATIONS = 2000
+# an N x N table takes about N * N / 250 ms to build in pure Python
+TABLE_MAX_STATIONS = 1000
+# traced queries per algorithm and pair set when measuring peak memory
+PEAK_QUERIES = 20
+# a median this much slower than the baseline's is reported as a regression
+REGRESSION_RATIO = 1.2
+
+def legacy_dfs(graph, s, e, minlength=-1, path=[]):
+    path = path + [s]
+    if s == e: return path
+    if s not in graph: return None
+    shortest = None
+    for node in graph[s]:
+        if node not in path:
+            if minlength == -1 or len(path) < (minlength - 1):
+                new = legacy_dfs(graph, node, e, minlength, path)
+                if new:
+                    if not shortest or len(new) < len(shortest):
+                        shortest = new
+                        minlength = len(new)
+    return shortest
+
+def legacy_bfs(graph, start, end):
+    """Unweighted shortest path via BFS."""
+    if start == end:
+        return [start]
+    visited = set([start])
+    queue = deque([[start]])
+    while queue:
+        path = queue.popleft()
+        node = path[-1]
+        for nei in graph.get(node, []):
+            if nei not in visited:
+                visited.add(nei)
+                new_path = path + [nei]
+                if nei == end:
+                    return new_path
+                queue.append(new_path)
+    return None
+
+def grid_network(side):
+    """A side x side grid; every row and every column is a line."""
+    name = lambda r, c: f"R{r}C{c}"
+    graph = {name(r, c): [name(r + dr, c + dc) for dr, dc in ((-1, 0), (1, 0), (0, -1), (0, 1))
+                          if 0 <= r + dr < side and 0 <= c + dc < side]
+             for r in range(side) for c in range(side)}
+    lines = {f"Row {r}": [name(r, c) for c in range(side)] for r in range(side)}
+    lines.update({f"Column {c}": [name(r, c) for r in range(side)] for c in range(side)})
+    return graph, lines
+
+def line_network(n):
+    """A single line of n stations: the largest diameter n stations can have."""
+    names = [f"S{i}" for i in range(n)]
+    graph = {s: [t for t in (names[i - 1] if i else None, names[i + 1] if i + 1 < n else None) if t]
+             for i, s in enumerate(names)}
+    return graph, {"Line": names}
+
+def networks_for(sizes):
+    """(label, graph, weights, lines, dfs ok) for the cities and synthetic sizes."""
+    out = []
+    for city in ('bengaluru', 'delhi'):
+        data = load_city(city)
+        out.append((city, data.graph, data.weights, data.lines, True))
+    for n in sizes:
+        side = max(2, round(math.sqrt(n)))
+        graph, lines = grid_network(side)
+        out.append((f"grid-{side}x{side}", graph, Weights(1.2), lines, False))
+        graph, lines = line_network(n)
+        out.append((f"line-{n}", graph, Weights(1.2), lines, n <= DFS_MAX_STATIONS))
+    return out
+
+def diameter_pair(cg):
+    """Ends of a longest shortest path, by two BFS sweeps (exact on trees)."""
+    def farthest(start):
+        hops = [-1] * len(cg)
+        hops[start] = 0
+        queue = deque([start])
+        u = start
+        while queue:
+            u = queue.popleft()
+            for k in range(cg.offsets[u], cg.offsets[u + 1]):
+                v = cg.neighbors[k]
+                if hops[v] < 0:
+                    hops[v] = hops[u] + 1
+                    queue.append(v)
+        return u
+    a = farthest(0)
+    return a, farthest(a)
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an ascending list."""
+    return sorted_values[max(0, math.ceil(p / 100 * len(sorted_values)) - 1)]
+
+def _run(query, pairs, budget):
+    """Per-query seconds for pairs, stopping once budget seconds are spent."""
+    times, spent = [], 0.0
+    for pair in pairs:
+        start = time.perf_counter()
+        query(*pair)
+        t = time.perf_counter() - start
+        times.append(t)
+        spent += t
+        if spent > budget:
+            break
+    return times
+
+def _peak_kib(query, pairs):
+    tracemalloc.start()
+    try:
+        for pair in pairs:
+            query(*pair)
+        return tracemalloc.get_traced_memory()[1] / 1024
+    finally:
+        tracemalloc.stop()
+
+def _setup(build):
+    """(result, seconds, peak KiB) of build()."""
+    start = time.perf_counter()
+    result = build()
+    seconds = time.perf_counter() - start
+    tracemalloc.start()
+    try:
+        build()
+        peak = tracemalloc.get_traced_memory()[1] / 1024
+    finally:
+        tracemalloc.stop()
+    return result, seconds, peak
+
+def bench_network(label, graph, weights, lines, dfs_ok, pairs, repeat, budget, seed, tmpdir):
+    """Result records for one network."""
+    results = []
+    cg, secs, peak = _setup(lambda: CompiledGraph(graph, weights))
+    setups = [('compile', secs, peak)]
+    names = cg.names
+    rng = random.Random(seed)
+    random_ids = [tuple(rng.sample(range(len(cg)), 2)) for _ in range(pairs)]
+    worst = diameter_pair(cg)
+    pair_sets = {'random': random_ids, 'diameter': [worst] * repeat}
+
+    algorithms = {}
+    if dfs_ok:
+        algorithms['legacy_dfs'] = (lambda a, b: legacy_dfs(graph, a, b), True)
+    algorithms['legacy_bfs'] = (lambda a, b: legacy_bfs(graph, a, b), True)
+    algorithms['bidirectional_bfs'] = (lambda i, j: shortest_path(cg, i, j), False)
+    algorithms['dijkstra'] = (lambda i, j: fastest_path(cg, i, j), False)
+    if len(cg) <= TABLE_MAX_STATIONS:
+        path = Path(tmpdir) / f"{label}.routes"
+        _, secs, peak = _setup(lambda: write_table(graph, weights, path))
+        setups.append(('route_table_build', secs, peak))
+        table = RouteTable(path)
+        algorithms['route_table'] = (table.route, False)
+    if lines:
+        lg, secs, peak = _setup(lambda: LineGraph(cg, weights, lines))
+        setups.append(('line_graph_build', secs, peak))
+        algorithms['line_search'] = (lg.search, False)
+
+    base = {'network': label, 'stations': len(cg), 'edges': len(cg.neighbors) // 2}
+    for step, secs, peak in setups:
+        results.append(dict(base, algorithm=step, pairs='setup', queries=1,
+                            p50_us=secs * 1e6, p99_us=secs * 1e6, mean_us=secs * 1e6, peak_kib=peak))
+    for name, (query, by_name) in algorithms.items():
+        for kind, ids in pair_sets.items():
+            args = [(names[i], names[j]) for i, j in ids] if by_name else ids
+            times = sorted(_run(query, args, budget))
+            results.append(dict(base, algorithm=name, pairs=kind, queries=len(times),
+                                truncated=len(times) < len(args),
+                                p50_us=percentile(times, 50) * 1e6, p99_us=percentile(times, 99) * 1e6,
+                                mean_us=sum(times) / len(times) * 1e6,
+                                peak_kib=_peak_kib(query, args[:min(len(times), PEAK_QUERIES)])))
+    return results
+
+def _key(r):
+    return (r['network'], r['algorithm'], r['pairs'])
+
+def compare(results, baseline):
+    """Lines describing latency changes against a baseline results file.
+
+    Regressions are judged on the median, which a handful of slow
+    queries cannot move the way they move p99.
+    """
+    old = {_key(r): r for r in json.loads(Path(baseline).read_text())['results']}
+    out = []
+    for r in results:
+        o = old.get(_key(r))
+        if o is None or not o['p50_us']:
+            continue
+        ratio = r['p50_us'] / o['p50_us']
+        flag = "  REGRESSION" if ratio > REGRESSION_RATIO else ""
+        out.append(f"  {r['network']:<18} {r['algorithm']:<20} {r['pairs']:<8} "
+                   f"p50 {o['p50_us']:>12.1f} -> {r['p50_us']:>12.1f} us ({ratio:.2f}x)  "
+                   f"p99 {o['p99_us']:>12.1f} -> {r['p99_us']:>12.1f} us{flag}")
+    return out
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the routing algorithms.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000],
+                        help="stations in each synthetic grid and line network")
+    parser.add_argument('--pairs', type=int, default=200, help="random pairs per network")
+    parser.add_argument('--repeat', type=int, default=20, help="runs of the diameter pair")
+    parser.add_argument('--budget', type=float, default=10.0,
+                        help="seconds per algorithm and pair set before the rest are skipped")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('-o', '--output', default='bench_results.json')
+    parser.add_argument('--baseline', help="earlier results file to compare against")
+    args = parser.parse_args(argv)
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 4 * DFS_MAX_STATIONS))
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for label, graph, weights, lines, dfs_ok in networks_for(args.sizes):
+            rows = bench_network(label, graph, weights, lines, dfs_ok,
+                                 args.pairs, args.repeat, args.budget, args.seed, tmpdir)
+            results.extend(rows)
+            for r in rows:
+                print(f"{r['network']:<18} {r['algorithm']:<20} {r['pairs']:<8} n={r['queries']:<4} "
+                      f"p50 {r['p50_us']:>12.1f} us  p99 {r['p99_us']:>12.1f} us  "
+                      f"peak {r['peak_kib']:>10.1f} KiB{'  (budget hit)' if r.get('truncated') else ''}",
+                      flush=True)
+    meta = {'python': platform.python_version(), 'platform': platform.platform(),
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'), **vars(args)}
+    Path(args.output).write_text(json.dumps({'meta': meta, 'results': results}, indent=1))
+    print(f"results -> {args.output}")
+    if args.baseline:
+        print(f"against {args.baseline}:")
+        print("\n".join(compare(results, args.baseline)))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,280 @@
+"""Closed stations and segments, routed around without a full rebuild.
+
+    python disruption.py --city delhi --close "RAJIV CHOWK"
+    python disruption.py --city delhi --bench 50
+
+Closures are kept per city by a Disruption.  Each column of a route
+table (every route into one destination) is a fastest-route tree, so a
+closure only invalidates the columns whose tree uses the closed station
+or segment, and within such a column only the stations routed through
+it.  Those are re-settled by a Dijkstra seeded from their unaffected
+neighbours; every other entry is still read from the table.
+"""
+import argparse
+import random
+import time
+from heapq import heappop, heappush
+
+from route_table import UNREACHABLE, build_table, compiled, load_table, network
+from routing import compile_graph, fastest_path
+
+class Disruption:
+    """Closures on one CompiledGraph and the route table patched around them.
+
+    next_hop and hops are build_table's arrays for cg (or a RouteTable's
+    views of them); without them every query is a live search.  Patched
+    columns are kept in columns, keyed by destination id.
+    """
+
+    def __init__(self, cg, next_hop=None, hops=None):
+        self.cg = cg
+        self.next_hop, self.hops = next_hop, hops
+        self.closed = set()
+        self.cut = set()
+        self.columns = {}
+        self._minutes = {(u, cg.neighbors[k]): cg.minutes[k]
+                         for u in range(len(cg)) for k in range(cg.offsets[u], cg.offsets[u + 1])}
+
+    def _id(self, name):
+        u = self.cg.index.get(name)
+        if u is None:
+            raise ValueError(f"unknown station {name!r}")
+        return u
+
+    def close(self, stations=(), edges=()):
+        """Close stations and (a, b) segments, both ways, in one pass over
+        the table; returns the number of columns patched."""
+        new_stations, new_edges = [], []
+        for name in stations:
+            u = self._id(name)
+            if u not in self.closed:
+                self.closed.add(u)
+                new_stations.append(u)
+        for a, b in edges:
+            u, v = self._id(a), self._id(b)
+            if (u, v) not in self._minutes and (v, u) not in self._minutes:
+                raise ValueError(f"no segment between {a!r} and {b!r}")
+            if (u, v) not in self.cut:
+                self.cut.update(((u, v), (v, u)))
+                new_edges.append((u, v))
+        if not new_stations and not new_edges:
+            return 0
+        return self._patch(new_stations, new_edges)
+
+    def close_station(self, name):
+        return self.close(stations=[name])
+
+    def close_edge(self, a, b):
+        return self.close(edges=[(a, b)])
+
+    def reopen(self, station=None, edge=None):
+        """Reopen a station or an (a, b) segment, or everything if neither is given.
+
+        Reopening can shorten routes anywhere, so the patches are dropped
+        and the remaining closures applied again to the table.
+        """
+        if station is None and edge is None:
+            self.closed.clear()
+            self.cut.clear()
+        if station is not None:
+            self.closed.discard(self._id(station))
+        if edge is not None:
+            u, v = self._id(edge[0]), self._id(edge[1])
+            self.cut.difference_update(((u, v), (v, u)))
+        self.columns.clear()
+        if self.closed or self.cut:
+            self._patch(self.closed, {e for e in self.cut if e[0] < e[1]})
+
+    def _column(self, j):
+        if j in self.columns:
+            return self.columns[j]
+        n = len(self.cg)
+        return self.next_hop[j::n].tolist(), self.hops[j::n].tolist()
+
+    def _patch(self, stations=(), edges=()):
+        """Re-settle the table entries that route through new closures."""
+        if self.next_hop is None:
+            return 0
+        patched = 0
+        for j in range(len(self.cg)):
+            if j in self.closed:
+                continue
+            nxt, hop = self._column(j)
+            roots = [s for s in stations if s != j and (s in nxt)]
+            for u, v in edges:
+                roots.extend(w for w, x in ((u, v), (v, u)) if nxt[w] == x)
+            if roots:
+                self.columns[j] = self._repair(j, nxt, hop, roots)
+                patched += 1
+        return patched
+
+    def _repair(self, j, nxt, hop, roots):
+        """Column j with the stations routed through roots rerouted.
+
+        The affected stations are the subtrees under roots, found by
+        walking in-edges whose next hop is the station above; the rest of
+        the column keeps its routes and only the costs the re-settling
+        needs are summed up its next hops.
+        """
+        cg, closed, cut, minutes = self.cg, self.closed, self.cut, self._minutes
+        transfer = cg.transfer
+        affected = set(roots)
+        stack = list(roots)
+        while stack:
+            v = stack.pop()
+            for k in range(cg.rev_offsets[v], cg.rev_offsets[v + 1]):
+                u = cg.rev_neighbors[k]
+                if nxt[u] == v and u not in affected:
+                    affected.add(u)
+                    stack.append(u)
+        dist = {j: 0.0}
+
+        def cost(u):
+            chain = []
+            while u not in dist:
+                chain.append(u)
+                u = nxt[u]
+            for w in reversed(chain):
+                v = nxt[w]
+                dist[w] = minutes[w, v] + (transfer[v] if v != j else 0.0) + dist[v]
+            return dist[chain[0]] if chain else dist[u]
+
+        nxt, hop = list(nxt), list(hop)
+        best = {}
+        for u in affected:
+            nxt[u] = hop[u] = UNREACHABLE
+            if u in closed:
+                continue
+            best[u] = float('inf')
+            for k in range(cg.offsets[u], cg.offsets[u + 1]):
+                v = cg.neighbors[k]
+                if (v not in affected and v not in closed and (u, v) not in cut
+                        and nxt[v] != UNREACHABLE):
+                    t = cg.minutes[k] + (transfer[v] if v != j else 0.0) + cost(v)
+                    if t < best[u]:
+                        best[u], nxt[u], hop[u] = t, v, hop[v] + 1
+        heap = [(t, u) for u, t in best.items() if t < float('inf')]
+        heap.sort()
+        while heap:
+            t, v = heappop(heap)
+            if t > best[v]:
+                continue
+            t += transfer[v]
+            for k in range(cg.rev_offsets[v], cg.rev_offsets[v + 1]):
+                u = cg.rev_neighbors[k]
+                nt = t + cg.rev_minutes[k]
+                if u in best and (u, v) not in cut and nt < best[u]:
+                    best[u], nxt[u], hop[u] = nt, v, hop[v] + 1
+                    heappush(heap, (nt, u))
+        return nxt, hop
+
+    def route(self, i, j):
+        """Station ids from station i to j avoiding closures, or None."""
+        if i in self.closed or j in self.closed:
+            return None
+        if self.next_hop is None:
+            return fastest_path(self.cg, i, j, self.closed, self.cut)
+        if j in self.columns:
+            nxt = self.columns[j][0]
+            step = nxt.__getitem__
+        else:
+            n, base = len(self.cg), self.next_hop
+            step = lambda u: base[u * n + j]
+        if step(i) == UNREACHABLE:
+            return None
+        path = [i]
+        while i != j:
+            i = step(i)
+            path.append(i)
+        return path
+
+    def find_route(self, start, end):
+        """Fastest open route between two station names, as names, or None."""
+        i, j = self.cg.ids(start, end)
+        if i is None or j is None:
+            return None
+        return self.cg.path_names(self.route(i, j))
+
+_disruptions = {}
+
+def disruption(city):
+    """The city's Disruption, over its route table when there is a current one."""
+    if city not in _disruptions:
+        table = load_table(city)
+        if table is None:
+            _disruptions[city] = Disruption(compiled(city))
+        else:
+            _disruptions[city] = Disruption(compiled(city), table.next_hop, table.hop_count)
+    return _disruptions[city]
+
+def full_rebuild(city, closed=(), cut=()):
+    """build_table for the city's graph with closed stations and (a, b) segments removed."""
+    graph, weights = network(city)
+    closed = set(closed)
+    cut = {(a, b) for a, b in cut} | {(b, a) for a, b in cut}
+    open_graph = {a: [b for b in neighbours if b not in closed and (a, b) not in cut]
+                  for a, neighbours in graph.items() if a not in closed}
+    cg = compile_graph(open_graph, weights)
+    return cg, build_table(cg)
+
+def _bench(city, runs, seed=0):
+    cg = compiled(city)
+    weights = network(city)[1]
+    next_hop, hops = build_table(cg)
+    stations = sorted(u for u in range(len(cg)) if cg.offsets[u + 1] - cg.offsets[u] > 1)
+    rng = random.Random(seed)
+    inc = full = patched = 0.0
+    for _ in range(runs):
+        s = rng.choice(stations)
+        d = Disruption(cg, next_hop, hops)
+        start = time.perf_counter()
+        patched += d.close_station(cg.names[s])
+        inc += time.perf_counter() - start
+        start = time.perf_counter()
+        open_cg, (open_next, _) = full_rebuild(city, [cg.names[s]])
+        full += time.perf_counter() - start
+        for i in range(len(cg)):
+            for j in range(len(cg)):
+                if s in (i, j):
+                    continue
+                path = cg.path_names(d.route(i, j))
+                k, l = open_cg.ids(cg.names[i], cg.names[j])
+                ok = open_next[k * len(open_cg) + l] != UNREACHABLE
+                if (path is None) == ok or (ok and abs(weights.path_minutes(path) - weights.path_minutes(
+                        open_cg.path_names(_walk(open_next, len(open_cg), k, l)))) > 1e-9):
+                    raise AssertionError(f"{cg.names[i]} -> {cg.names[j]} differs with {cg.names[s]} closed")
+    print(f"{city}: {runs} single-station closures, {len(cg)} stations")
+    print(f"  incremental {inc / runs * 1000:.2f} ms ({patched / runs:.0f} of {len(cg)} columns patched)")
+    print(f"  full rebuild {full / runs * 1000:.2f} ms, every route matches")
+
+def _walk(next_hop, n, i, j):
+    path = [i]
+    while i != j:
+        i = next_hop[i * n + j]
+        path.append(i)
+    return path
+
+def main(argv=None):
+    from route_table import CITIES
+
+    parser = argparse.ArgumentParser(description="Route around closed stations and segments.")
+    parser.add_argument('--city', choices=CITIES, default='delhi')
+    parser.add_argument('--close', action='append', default=[], metavar='STATION')
+    parser.add_argument('--close-edge', action='append', default=[], nargs=2, metavar=('A', 'B'))
+    parser.add_argument('--bench', type=int, metavar='RUNS',
+                        help="time random closures against a full rebuild, checking every route")
+    args = parser.parse_args(argv)
+    if args.bench:
+        _bench(args.city, args.bench)
+        return
+    cg = compiled(args.city)
+    d = Disruption(cg, *build_table(cg))
+    start = time.perf_counter()
+    patched = d.close(args.close, args.close_edge)
+    print(f"{patched} of {len(cg)} columns patched in {(time.perf_counter() - start) * 1000:.2f} ms")
+    start = time.perf_counter()
+    full_rebuild(args.city, args.close, args.close_edge)
+    print(f"full rebuild {(time.perf_counter() - start) * 1000:.2f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -97,6 +97,8 @@ delhi = {'ASHOK PARK MAIN': ['INDERLOK', 'PUNJABI BAGH', 'SATGURU RAM SINGH MARG
 'PATEL NAGAR': ['RAJENDRA PLACE', 'SHADIPUR'],
 'PEERAGARHI': ['PASCHIM VIHAR (WEST)', 'UDYOG NAGAR'],
 'PRATAP NAGAR': ['PULBANGASH', 'SHASTRI NAGAR'],
+'PULBANGASH': ['PRATAP NAGAR', 'TIS HAZARI'],
+'TIS HAZARI': ['PULBANGASH', 'KASHMERE GATE'],
 'PUNJABI BAGH': ['ASHOK PARK MAIN', 'SHIVAJI PARK'],
 'RAJDHANI PARK': ['NANGLOI RAILWAY STATION', 'MUNDKA'],
 'RAJENDRA PLACE': ['PATEL NAGAR', 'KAROL BAGH'],
@@ -163,7 +165,7 @@ delhi = {'ASHOK PARK MAIN': ['INDERLOK', 'PUNJABI BAGH', 'SATGURU RAM SINGH MARG
 'SIKANDERPUR' : ['MG ROAD','GURU DRONACHARYA'],
 'GURU DRONACHARYA' : ['ARJANGARH','SIKANDERPUR'],
 'ARJANGARH' : ['GHITORNI','GURU DRONACHARYA'],
-'JOR BAGH' : ['AIIMS','LOK KALYAN MARG'],
+'JOR BAGH' : ['LOK KALYAN MARG'],
 'LOK KALYAN MARG' : ['JOR BAGH','UDYOG BHAWAN'],
 'UDYOG BHAWAN' : ['CENTRAL SECRETERIAT','LOK KALYAN MARG'],
 'CENTRAL SECRETERIAT' : ['UDYOG BHAWAN','PATEL CHOWK','JANPATH','KHAN MARKET'],
@@ -297,7 +299,7 @@ delhi = {'ASHOK PARK MAIN': ['INDERLOK', 'PUNJABI BAGH', 'SATGURU RAM SINGH MARG
 'DELTA-1':['GNIDA OFFICE','ALPHA-1'],
 'GNIDA OFFICE':['DELTA-1','DEPOT'],
 'DEPOT':['GNIDA OFFICE'],
-'NEW DELHI':['CHAWRI BAZAR','RAJIV CHOWK','DELHI AEROCITY'],
+'NEW DELHI':['CHAWRI BAZAR','RAJIV CHOWK'],
 'CHAWRI BAZAR':['NEW DELHI','CHANDNI CHOWK'],
 'CHANDNI CHOWK':['CHAWRI BAZAR','KASHMERE GATE'],
 'KASHMERE GATE':['SHASTRI PARK','CHANDNI CHOWK','LAL QUILA','TIS HAZARI','CIVIL LINES'],
@@ -306,7 +308,7 @@ delhi = {'ASHOK PARK MAIN': ['INDERLOK', 'PUNJABI BAGH', 'SATGURU RAM SINGH MARG
 'VISHWAVIDYALAYA':['VIDHAN SABHA','GURU TEJ BAHADUR NAGAR'],
 'GURU TEJ BAHADUR NAGAR':['VISHWAVIDYALAYA','MODEL TOWN'],
 'MODEL TOWN':['GURU TEJ BAHADUR NAGAR','AZADPUR'],
-'AZADPUR':['MODEL TOWN','MAJLIS PARK','NETAJI SUBASH PLACE','ADARSH NAGAR'],
+'AZADPUR':['MODEL TOWN','MAJLIS PARK','ADARSH NAGAR'],
 'MAJLIS PARK':['AZADPUR'],
 'ADARSH NAGAR':['AZADPUR','JAHANGIRPURI'],
 'JAHANGIRPURI':['ADARSH NAGAR','HAIDERPUR BADLI MOR'],
@@ -322,4 +324,216 @@ delhi = {'ASHOK PARK MAIN': ['INDERLOK', 'PUNJABI BAGH', 'SATGURU RAM SINGH MARG
 'INDRA PRASTHA':['SUPREME COURT','YAMUNA BANK']
  }
 
+# Route weights.  Segment lengths are in km and keyed by station pair in
+# either direction; a segment missing from *_km uses the network's average
+# spacing.  Transfer times are the minutes a route loses changing trains at
+# an interchange.
+bengaluru_default_km = 1.2
+bengaluru_km = {}
+bengaluru_transfers = {
+    'NADAPRABHU KEMPEGOWDA STATION, MAJESTIC': 5,
+    'RASHTREEYA VIDYALAYA ROAD': 4,
+}
+
+delhi_default_km = 1.2
+delhi_km = {}
+delhi_transfers = dict.fromkeys([
+    'ASHOK PARK MAIN', 'AZADPUR', 'BOTANICAL GARDEN', 'CENTRAL SECRETARIAT',
+    'DILLI HAAT - INA', 'DWARKA SECTOR-21', 'HAUZ KHAS', 'INDERLOK',
+    'JANAKPURI (WEST)', 'KALKAJI MANDIR', 'KARKARDUMA', 'KASHMERE GATE',
+    'KIRTI NAGAR', 'LAJPAT NAGAR', 'MANDI HOUSE', 'MAYUR VIHAR PHASE-1',
+    'NETAJI SUBHASH PLACE', 'NEW DELHI', 'RAJIV CHOWK', 'RAJOURI GARDEN',
+    'SECTOR-52', 'WELCOME', 'YAMUNA BANK',
+], 5)
+
+# Spellings graph_check.normalize folds into one station name; None drops
+# a placeholder neighbour.
+bengaluru_aliases = {}
+delhi_aliases = {
+    '$$$': None,
+    'CENTRAL SECRETERIAT': 'CENTRAL SECRETARIAT',
+    'I.I.T': 'IIT',
+    'MAYUR VIHAR PHASE - 1': 'MAYUR VIHAR PHASE-1',
+    'NAIRANA VIHAR': 'NARAINA VIHAR',
+    'NETAJI SUBASH PLACE': 'NETAJI SUBHASH PLACE',
+    'OKHLA BIRD SANTUARY': 'OKHLA BIRD SANCTUARY',
+    'SHAKIR PUR': 'SHAKUR PUR',
+}
 
+# Everyday names riders type for a station, used by station search only.
+bengaluru_nicknames = {
+    'MAJESTIC': 'NADAPRABHU KEMPEGOWDA STATION, MAJESTIC',
+    'KEMPEGOWDA': 'NADAPRABHU KEMPEGOWDA STATION, MAJESTIC',
+    'KSR RAILWAY STATION': 'KRANTIVIRA SANGOLLI RAYANNA RAILWAY STATION',
+    'CITY RAILWAY STATION': 'KRANTIVIRA SANGOLLI RAYANNA RAILWAY STATION',
+    'VIDHANA SOUDHA': 'DR.B.R.AMBEDKAR STATION, VIDHANA SOUDHA',
+    'CENTRAL COLLEGE': 'SRI M VISVESWARAYA STATION, CENTRAL COLLEGE',
+    'HOSAHALLI': 'SRI BALAGANGADHARANATHA SWAMIJI STATION, HOSAHALLI',
+    'MG ROAD': 'MAHATMA GANDHI ROAD',
+    'KR MARKET': 'KRISHNA RAJENDRA MARKET',
+    'RV ROAD': 'RASHTREEYA VIDYALAYA ROAD',
+    'JP NAGAR': 'JAYA PRAKASH NAGAR',
+    'RR NAGAR': 'RAJARAJESHWARI NAGAR',
+    'SV ROAD': 'SWAMI VIVEKANANDA ROAD',
+    'SAMPIGE ROAD': 'MANTRI SQUARE SAMPIGE ROAD',
+    'KUVEMPU ROAD': 'MAHAKAVI KUVEMPU ROAD',
+    'SILK BOARD': 'CENTRAL SILK BOARD',
+    'BTM': 'BTM LAYOUT',
+    'BOMMASANDRA': 'DELTA ELECTRONICS BOMMASANDRA',
+    'KONAPPANA AGRAHARA': 'INFOSYS FOUNDATION KONAPPANA AGRAHARA',
+    'HEBBAGODI': 'BIOCON HEBBAGODI',
+}
+delhi_nicknames = {
+    'CP': 'RAJIV CHOWK',
+    'CONNAUGHT PLACE': 'RAJIV CHOWK',
+    'ISBT': 'KASHMERE GATE',
+    'INA': 'DILLI HAAT - INA',
+    'IGI AIRPORT': 'AIRPORT (T-3)',
+    'T3': 'AIRPORT (T-3)',
+    'T1': 'TERMINAL1-IGI AIRPORT',
+    'NSP': 'NETAJI SUBHASH PLACE',
+    'GTB NAGAR': 'GURU TEJ BAHADUR NAGAR',
+    'RK PURAM': 'R.K PURAM',
+    'DU': 'VISHWAVIDYALAYA',
+    'DELHI UNIVERSITY': 'VISHWAVIDYALAYA',
+    'NEW DELHI RAILWAY STATION': 'NEW DELHI',
+    'MOTI BAGH': 'SIR M. VISHWESHARAIYAH MOTI BAGH',
+}
+
+
+# Lines in running order; a station on several lines is an interchange.
+bengaluru_lines = {
+    'Green': [
+        'NAGASANDRA', 'DASARAHALLI', 'JALAHALLI', 'PEENYA INDUSTRY',
+        'PEENYA', 'GORAGUNTEPALYA', 'YESHWANTHPUR', 'SANDAL SOAP FACTORY',
+        'MAHALAKSHMI', 'RAJAJINAGAR', 'MAHAKAVI KUVEMPU ROAD', 'SRIRAMPURA',
+        'MANTRI SQUARE SAMPIGE ROAD',
+        'NADAPRABHU KEMPEGOWDA STATION, MAJESTIC', 'CHICKPETE',
+        'KRISHNA RAJENDRA MARKET', 'NATION COLLEGE', 'LALBAGH',
+        'SOUTH END CIRCLE', 'JAYANAGAR', 'RASHTREEYA VIDYALAYA ROAD',
+        'BANASHANKARI', 'JAYA PRAKASH NAGAR', 'YELACHENAHALLI',
+        'KONANAKUNTE CROSS', 'DODDAKALLASANDRA', 'VAJRAHALLI',
+        'THALAGHATTAPURA', 'SILK INSTITUTE',
+    ],
+    'Purple': [
+        'KENGERI', 'KENGERI BUS TERMINAL', 'PATTANAGERE', 'JNANABHARATHI',
+        'RAJARAJESHWARI NAGAR', 'NAYANDAHALLI', 'MYSORE ROAD',
+        'DEEPANJALI NAGAR', 'ATTIGUPPE', 'VIJAYANAGAR',
+        'SRI BALAGANGADHARANATHA SWAMIJI STATION, HOSAHALLI', 'MAGADI ROAD',
+        'KRANTIVIRA SANGOLLI RAYANNA RAILWAY STATION',
+        'NADAPRABHU KEMPEGOWDA STATION, MAJESTIC',
+        'SRI M VISVESWARAYA STATION, CENTRAL COLLEGE',
+        'DR.B.R.AMBEDKAR STATION, VIDHANA SOUDHA', 'CUBBON PARK',
+        'MAHATMA GANDHI ROAD', 'TRINITY', 'HALASURU', 'INDIRANAGAR',
+        'SWAMI VIVEKANANDA ROAD', 'BAIYYAPANAHALLI',
+    ],
+    'Yellow': [
+        'RASHTREEYA VIDYALAYA ROAD', 'RAGIGUDDA', 'JAYADEVA HOSPITAL',
+        'BTM LAYOUT', 'CENTRAL SILK BOARD', 'BOMMANAHALLI', 'HONGASANDRA',
+        'KUDLU GATE', 'SINGASANDRA', 'HOSA ROAD', 'BERATENA AGRAHARA',
+        'ELECTRONIC CITY', 'INFOSYS FOUNDATION KONAPPANA AGRAHARA',
+        'HUSKUR ROAD', 'BIOCON HEBBAGODI', 'DELTA ELECTRONICS BOMMASANDRA',
+    ],
+}
+
+delhi_lines = {
+    'Red': [
+        'RITHALA', 'ROHINI (WEST)', 'ROHINI (EAST)', 'PITAMPURA',
+        'KOHAT ENCLAVE', 'NETAJI SUBHASH PLACE', 'KESHAV PURAM',
+        'KANHAIYA NAGAR', 'INDERLOK', 'SHASTRI NAGAR', 'PRATAP NAGAR',
+        'PULBANGASH', 'TIS HAZARI', 'KASHMERE GATE', 'SHASTRI PARK',
+        'SEELAMPUR', 'WELCOME', 'SHAHDARA', 'MANSAROVAR PARK', 'JHILMIL',
+        'DILSHAD GARDEN', 'SHAHEED NAGAR', 'RAJBAGH',
+        'MAJOR MOHIT SHARMA RAJENDRA NAGAR', 'SHYAM PARK', 'MOHAN NAGAR',
+        'ARTHALA', 'HINDON RIVER', 'SHAHEED STHAL',
+    ],
+    'Yellow': [
+        'SAMAYPUR BADLI', 'ROHINI SECTOR-18,19', 'HAIDERPUR BADLI MOR',
+        'JAHANGIRPURI', 'ADARSH NAGAR', 'AZADPUR', 'MODEL TOWN',
+        'GURU TEJ BAHADUR NAGAR', 'VISHWAVIDYALAYA', 'VIDHAN SABHA',
+        'CIVIL LINES', 'KASHMERE GATE', 'CHANDNI CHOWK', 'CHAWRI BAZAR',
+        'NEW DELHI', 'RAJIV CHOWK', 'PATEL CHOWK', 'CENTRAL SECRETARIAT',
+        'UDYOG BHAWAN', 'LOK KALYAN MARG', 'JOR BAGH', 'DILLI HAAT - INA',
+        'AIIMS', 'GREEN PARK', 'HAUZ KHAS', 'MALVIYA NAGAR', 'SAKET',
+        'QUTAB MINAR', 'CHHATTARPUR', 'SULTANPUR', 'GHITORNI', 'ARJANGARH',
+        'GURU DRONACHARYA', 'SIKANDERPUR', 'MG ROAD', 'IFFCO CHOWK',
+        'HUDA CITY CENTRE',
+    ],
+    'Blue': [
+        'DWARKA SECTOR-21', 'DWARKA SECTOR-8', 'DWARKA SECTOR-9',
+        'DWARKA SECTOR-10', 'DWARKA SECTOR-11', 'DWARKA SECTOR-12',
+        'DWARKA SECTOR-13', 'DWARKA SECTOR-14', 'DWARKA', 'DWARKA MOR',
+        'NAWADA', 'UTTAM NAGAR (WEST)', 'UTTAM NAGAR (EAST)',
+        'JANAKPURI (WEST)', 'JANAKPURI (EAST)', 'TILAK NAGAR',
+        'SUBHASH NAGAR', 'TAGORE GARDEN', 'RAJOURI GARDEN', 'RAMESH NAGAR',
+        'MOTI NAGAR', 'KIRTI NAGAR', 'SHADIPUR', 'PATEL NAGAR',
+        'RAJENDRA PLACE', 'KAROL BAGH', 'JHANDEWALAN', 'RK ASHRAM MARG',
+        'RAJIV CHOWK', 'BARAKHAMBA ROAD', 'MANDI HOUSE', 'SUPREME COURT',
+        'INDRA PRASTHA', 'YAMUNA BANK', 'AKSHARDAM', 'MAYUR VIHAR PHASE-1',
+        'MAYUR VIHAR EXTENSION', 'NEW ASHOK NAGAR', 'NOIDA SECTOR-15',
+        'NOIDA SECTOR-16', 'NOIDA SECTOR-18', 'BOTANICAL GARDEN',
+        'GOLF COURSE', 'NOIDA CITY CENTRE', 'SECTOR-34', 'SECTOR-52',
+        'SECTOR-61', 'SECTOR-59', 'SECTOR-62', 'NOIDA ELECTRONIC CITY',
+    ],
+    'Blue Branch': [
+        'YAMUNA BANK', 'LAXMI NAGAR', 'NIRMAN VIHAR', 'PREET VIHAR',
+        'KARKARDUMA', 'ANAND VIHAR', 'KOUSHAMBI', 'VAISHALI',
+    ],
+    'Green': [
+        'INDERLOK', 'ASHOK PARK MAIN', 'PUNJABI BAGH', 'SHIVAJI PARK',
+        'MADIPUR', 'PASCHIM VIHAR (EAST)', 'PASCHIM VIHAR (WEST)',
+        'PEERAGARHI', 'UDYOG NAGAR', 'MAHARAJA SURAJMAL STADIUM', 'NANGLOI',
+        'NANGLOI RAILWAY STATION', 'RAJDHANI PARK', 'MUNDKA',
+        'MUNDKA INDUSTRIAL AREA', 'GHEVRA', 'TIKRI KALAN', 'TIKRI BORDER',
+        'PANDIT SHREE RAM SHARMA', 'BAHADURGARH CITY',
+        'BRIG. HOSHIAR SINGH',
+    ],
+    'Green Branch': [
+        'KIRTI NAGAR', 'SATGURU RAM SINGH MARG', 'ASHOK PARK MAIN',
+    ],
+    'Violet': [
+        'KASHMERE GATE', 'LAL QUILA', 'JAMA MASJID', 'DELHI GATE', 'ITO',
+        'MANDI HOUSE', 'JANPATH', 'CENTRAL SECRETARIAT', 'KHAN MARKET',
+        'JLN STADIUM', 'JANGPURA', 'LAJPAT NAGAR', 'MOOLCHAND',
+        'KAILASH COLONY', 'NEHRU PLACE', 'KALKAJI MANDIR', 'GOVIND PURI',
+        'HARKESH NAGAR OKHLA', 'JASOLA APOLLO', 'SARITA VIHAR',
+        'MOHAN ESTATE', 'TUGHLAKABAD', 'BADARPUR BORDER', 'SARAI',
+        'NHPC CHOWK', 'MEWALA MAHARAJPUR', 'SECTOR - 28', 'BADKAL MOR',
+        'OLD FARIDABAD', 'NEELAM CHOWK AJRONDA', 'BATA CHOWK',
+        'ESCORTS MUJESAR', 'SANT SURDAS(SIHI)', 'RAJA NAHAR SINGH',
+    ],
+    'Pink': [
+        'MAJLIS PARK', 'AZADPUR', 'SHALIMAR BAGH', 'NETAJI SUBHASH PLACE',
+        'SHAKUR PUR', 'PUNJABI BAGH (W)', 'ESI HOSPITAL', 'RAJOURI GARDEN',
+        'MAYAPURI', 'NARAINA VIHAR', 'DELHI CANTT.',
+        'DURGABAI DESHMUKH SOUTH CAMPUS',
+        'SIR M. VISHWESHARAIYAH MOTI BAGH', 'BHIKAJI CAMA PLACE',
+        'SAROJINI NAGAR', 'DILLI HAAT - INA', 'SOUTH EXTN', 'LAJPAT NAGAR',
+        'VINOBA PURI', 'ASHRAM', 'SARAI KALE KHAN NIZAMUDDIN',
+        'MAYUR VIHAR PHASE-1', 'MAYUR VIHAR POCKET-1',
+        'TRILOKPURI-SANJAY LAKE', 'EAST VINOD NAGAR', 'IP EXTENSION',
+        'KARKARDUMA', 'KARKARDUMA COURT', 'KRISHNA NAGAR', 'EAST AZADNAGAR',
+        'WELCOME', 'JAFRABAD', 'MAUJPUR-BABARPUR', 'GOKULPURI',
+        'JOHRI ENCLAVE', 'SHIV VIHAR',
+    ],
+    'Magenta': [
+        'JANAKPURI (WEST)', 'DABRI MOR - JANAKPURI SOUTH', 'DASHRATH PURI',
+        'PALAM', 'SARDAR BAZAR CONTONMENT', 'TERMINAL1-IGI AIRPORT',
+        'SHANKAR VIHAR', 'VASANT VIHAR', 'MUNIRKA', 'R.K PURAM', 'IIT',
+        'HAUZ KHAS', 'PANCHSHEEL PARK', 'CHIRAG DELHI', 'G K',
+        'NEHRU ENCLAVE', 'KALKAJI MANDIR', 'OKHLA NSIC', 'SUKHDEV VIHAR',
+        'JAMIA MILIA ISLAMIA', 'OKHLA VIHAR', 'JASOLA VIHAR SHAHEEN BAGH',
+        'KALINDI KUNJ', 'OKHLA BIRD SANCTUARY', 'BOTANICAL GARDEN',
+    ],
+    'Airport Express': [
+        'NEW DELHI', 'SHIVAJI STADIUM', 'DHAULA KUAN', 'DELHI AEROCITY',
+        'AIRPORT (T-3)', 'DWARKA SECTOR-21',
+    ],
+    'Aqua': [
+        'SECTOR-52', 'SECTOR-51', 'SECTOR-50', 'SECTOR-76', 'SECTOR-101',
+        'SECTOR-81', 'SECTOR-83', 'SECTOR-137', 'SECTOR-142', 'SECTOR-143',
+        'SECTOR-144', 'SECTOR-145', 'SECTOR-146', 'SECTOR-147',
+        'SECTOR-148', 'KP-2', 'PARICW', 'ALPHA-1', 'DELTA-1',
+        'GNIDA OFFICE', 'DEPOT',
+    ],
+}
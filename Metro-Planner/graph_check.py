@@ -0,0 +1,175 @@
+"""Integrity checks and normalisation for the networks in graph.py.
+
+    python graph_check.py            # report on every city
+
+A dict literal silently keeps only the last of two equal keys, so the
+checks read graph.py's source rather than the imported dicts.
+"""
+import argparse
+import ast
+import difflib
+import time
+from pathlib import Path
+
+GRAPH_SOURCE = Path(__file__).parent / "graph.py"
+
+_sources = {}
+
+def dict_entries(name, path=GRAPH_SOURCE):
+    """(station, neighbours, line) for every entry of the dict literal
+    assigned to name, duplicate keys included, in source order."""
+    path = Path(path)
+    if path not in _sources:
+        _sources[path] = ast.parse(path.read_text(encoding="utf-8"))
+    for node in _sources[path].body:
+        if (isinstance(node, ast.Assign) and isinstance(node.value, ast.Dict)
+                and any(isinstance(t, ast.Name) and t.id == name for t in node.targets)):
+            return [(ast.literal_eval(k), ast.literal_eval(v), k.lineno)
+                    for k, v in zip(node.value.keys, node.value.values)]
+    raise KeyError(f"no dict literal named {name!r} in {path}")
+
+def check(entries):
+    """Problems in raw entries, as a dict of lists.
+
+    duplicates: (station, lines) for keys defined more than once
+    dangling:   (name, stations listing it, closest station or None)
+    asymmetric: (a, b) where a lists b but b does not list a
+    self_loops: stations listing themselves
+    """
+    lines, graph = {}, {}
+    for station, neighbours, line in entries:
+        lines.setdefault(station, []).append(line)
+        graph.setdefault(station, []).extend(neighbours)
+    dangling = {}
+    asymmetric, self_loops = [], []
+    for a, neighbours in graph.items():
+        for b in neighbours:
+            if b == a:
+                self_loops.append(a)
+            elif b not in graph:
+                dangling.setdefault(b, []).append(a)
+            elif a not in graph[b]:
+                asymmetric.append((a, b))
+    return {
+        'duplicates': [(s, ls) for s, ls in lines.items() if len(ls) > 1],
+        'dangling': [(b, srcs, next(iter(difflib.get_close_matches(b, graph, n=1, cutoff=0.8)), None))
+                     for b, srcs in dangling.items()],
+        'asymmetric': asymmetric,
+        'self_loops': self_loops,
+    }
+
+def normalize(entries, aliases=None):
+    """An undirected adjacency dict built from raw entries.
+
+    Duplicate keys are merged instead of overwritten, aliases rename
+    misspelt stations (an alias of None drops the name), self-loops are
+    removed and every edge is listed in both directions.  Neighbour order
+    follows the source.
+    """
+    aliases = aliases or {}
+    graph = {}
+    for station, neighbours, _ in entries:
+        a = aliases.get(station, station)
+        if a is None:
+            continue
+        row = graph.setdefault(a, {})
+        for b in neighbours:
+            b = aliases.get(b, b)
+            if b is not None and b != a:
+                row[b] = None
+                graph.setdefault(b, {})[a] = None
+    return {station: list(row) for station, row in graph.items()}
+
+def line_issues(graph, lines):
+    """How line lists disagree with a normalized graph, as a dict of lists.
+
+    unknown:  (line, station) for stations the graph does not have
+    missing:  (line, a, b) for consecutive stops the graph does not link
+    untagged: (a, b) graph edges that no line runs along
+    """
+    unknown, missing, ridden = [], [], set()
+    for line, stations in lines.items():
+        unknown.extend((line, s) for s in stations if s not in graph)
+        for a, b in zip(stations, stations[1:]):
+            ridden.add(frozenset((a, b)))
+            if b not in graph.get(a, ()):
+                missing.append((line, a, b))
+    untagged = [(a, b) for a, neighbours in graph.items() for b in neighbours
+                if a < b and frozenset((a, b)) not in ridden]
+    return {'unknown': unknown, 'missing': missing, 'untagged': untagged}
+
+def components(graph):
+    """Connected components of an undirected graph, largest first."""
+    seen, comps = set(), []
+    for start in graph:
+        if start in seen:
+            continue
+        seen.add(start)
+        comp, stack = [start], [start]
+        while stack:
+            for nei in graph[stack.pop()]:
+                if nei not in seen:
+                    seen.add(nei)
+                    comp.append(nei)
+                    stack.append(nei)
+        comps.append(comp)
+    comps.sort(key=len, reverse=True)
+    return comps
+
+def component_stats(graph):
+    comps = components(graph)
+    return {
+        'stations': len(graph),
+        'edges': sum(len(v) for v in graph.values()) // 2,
+        'components': len(comps),
+        'sizes': [len(c) for c in comps],
+        'isolated': [c[0] for c in comps if len(c) == 1],
+    }
+
+def report(city, aliases=None, lines=None, path=GRAPH_SOURCE):
+    """Human-readable lines describing one city's checks."""
+    entries = dict_entries(city, path)
+    problems = check(entries)
+    aliases = aliases or {}
+    out = [f"{city}: {len(entries)} entries"]
+    for station, ls in problems['duplicates']:
+        out.append(f"  duplicate key {station!r} on lines {', '.join(map(str, ls))}")
+    for name, srcs, near in problems['dangling']:
+        fix = (f" -> alias {aliases[name]!r}" if name in aliases
+               else " (an alias folds the other spelling into it)" if name in aliases.values()
+               else f" (did you mean {near!r}?)" if near else "")
+        out.append(f"  dangling {name!r} from {', '.join(map(repr, srcs))}{fix}")
+    for a, b in problems['asymmetric']:
+        out.append(f"  one-way edge {a!r} -> {b!r}")
+    for station in problems['self_loops']:
+        out.append(f"  self-loop on {station!r}")
+    graph = normalize(entries, aliases)
+    if lines:
+        issues = line_issues(graph, lines)
+        for line, station in issues['unknown']:
+            out.append(f"  {line} line stops at unknown station {station!r}")
+        for line, a, b in issues['missing']:
+            out.append(f"  {line} line runs {a!r} -> {b!r} but the graph has no such edge")
+        for a, b in issues['untagged']:
+            out.append(f"  edge {a!r} - {b!r} is on no line")
+    stats = component_stats(graph)
+    out.append(f"  normalized: {stats['stations']} stations, {stats['edges']} edges, "
+               f"{stats['components']} component(s) of sizes {stats['sizes']}")
+    return out
+
+def main(argv=None):
+    import graph as networks
+    from route_table import CITIES
+
+    parser = argparse.ArgumentParser(description="Check the networks in graph.py.")
+    parser.add_argument('--city', choices=CITIES, action='append',
+                        help="only check this city (repeatable, default: all)")
+    args = parser.parse_args(argv)
+    start = time.perf_counter()
+    for city in args.city or CITIES:
+        print("\n".join(report(city, getattr(networks, f"{city}_aliases"),
+                               getattr(networks, f"{city}_lines", None))))
+    print(f"checked in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+if __name__ == "__main__":
+    main()
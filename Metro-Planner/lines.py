@@ -0,0 +1,286 @@
+"""Line-aware journeys over (station, line) states.
+
+A journey is planned on a state graph where riding to the next stop on
+the same line costs the segment time and changing lines at an
+interchange costs its transfer time plus one transfer, so routes can
+minimise travel time or the number of changes and come back as legs.
+"""
+from heapq import heappop, heappush
+
+from disruption import disruption
+from registry import load_city
+from route_table import compiled, network
+
+# transfer time at a station on several lines that *_transfers does not list
+DEFAULT_TRANSFER_MINUTES = 5
+OBJECTIVES = ('time', 'transfers')
+# pseudo-state that search paths start from; its moves board any line
+SOURCE = -1
+
+def _by_time(minimize):
+    if minimize not in OBJECTIVES:
+        raise ValueError(f"minimize must be one of {OBJECTIVES}")
+    return minimize == 'time'
+
+def _loopless(stations):
+    """True unless a station recurs other than by changing line there."""
+    seen, last = set(), None
+    for u in stations:
+        if u != last:
+            if u in seen:
+                return False
+            seen.add(u)
+            last = u
+    return True
+
+class LineGraph:
+    """(station, line) states of one network with ride and change edges.
+
+    State k is station station_of[k] (a CompiledGraph id) on line
+    line_of[k]; edges[k] lists (state, minutes, transfers) moves.
+    """
+    __slots__ = ('cg', 'line_names', 'station_of', 'line_of', 'states_at', 'edges')
+
+    def __init__(self, cg, weights, lines):
+        self.cg = cg
+        self.line_names = list(lines)
+        self.station_of, self.line_of, self.edges = [], [], []
+        self.states_at = {}
+        state = {}
+        for li, stations in enumerate(lines.values()):
+            try:
+                ids = [cg.index[name] for name in stations]
+            except KeyError as e:
+                raise ValueError(f"line {self.line_names[li]!r} has unknown station {e.args[0]!r}") from None
+            for u in ids:
+                if (u, li) not in state:
+                    state[u, li] = len(self.station_of)
+                    self.station_of.append(u)
+                    self.line_of.append(li)
+                    self.edges.append([])
+                    self.states_at.setdefault(u, []).append(state[u, li])
+            for a, b in zip(ids, ids[1:]):
+                sa, sb = state[a, li], state[b, li]
+                self.edges[sa].append((sb, weights.segment_minutes(cg.names[a], cg.names[b]), 0))
+                self.edges[sb].append((sa, weights.segment_minutes(cg.names[b], cg.names[a]), 0))
+        for u, here in self.states_at.items():
+            minutes = weights.transfers.get(cg.names[u], DEFAULT_TRANSFER_MINUTES)
+            for s in here:
+                self.edges[s].extend((t, minutes, 1) for t in here if t != s)
+
+    def lines_at(self, name):
+        """Names of the lines serving a station."""
+        u = self.cg.index.get(name)
+        return [self.line_names[self.line_of[s]] for s in self.states_at.get(u, ())]
+
+    def _moves(self, s, start):
+        if s == SOURCE:
+            return [(t, 0.0, 0) for t in self.states_at.get(start, ())]
+        return self.edges[s]
+
+    def _move_cost(self, s, t, start):
+        return next((m, x) for u, m, x in self._moves(s, start) if u == t)
+
+    def _dijkstra(self, start, end, by_time, source=SOURCE, cost=(0.0, 0),
+                  banned=frozenset(), banned_states=frozenset(), cut=frozenset(), changed=False):
+        """(best, parent, settled) of a search from source, stopping once a
+        state at station end is settled; it is then settled[-1].
+
+        best maps states to (minutes, transfers), parent to the state before
+        and settled lists states in the order their cost became final.
+        A state entered by changing line may not change again; changed
+        says whether source itself was.
+        """
+        key = (lambda c: c) if by_time else (lambda c: (c[1], c[0]))
+        station_of = self.station_of
+        best = {source: cost}
+        parent = {source: None}
+        settled = []
+        heap = [(key(cost), source)]
+        while heap:
+            k, s = heappop(heap)
+            c = best[s]
+            if key(c) != k:
+                continue
+            settled.append(s)
+            if s != SOURCE and station_of[s] == end:
+                break
+            p = parent[s]
+            no_change = s != SOURCE and (station_of[s] == start or (changed if s == source else
+                                         p != SOURCE and station_of[p] == station_of[s]))
+            for t, m, x in self._moves(s, start):
+                if (x and no_change) or t in banned_states or station_of[t] in banned or (s, t) in cut:
+                    continue
+                nc = (c[0] + m, c[1] + x)
+                if t not in best or key(nc) < key(best[t]):
+                    best[t] = nc
+                    parent[t] = s
+                    heappush(heap, (key(nc), t))
+        return best, parent, settled
+
+    def _search(self, start, end, by_time, source=SOURCE, cost=(0.0, 0),
+                banned=frozenset(), banned_states=frozenset(), cut=frozenset(), changed=False):
+        """Best (path, cost) from source to any state at station end, or None.
+
+        Paths begin at the SOURCE pseudo-state, whose moves board any line
+        at start.  banned stations and banned_states may not be entered and
+        cut holds (state, state) moves that may not be taken.  Changing
+        line at start is never allowed, since boarding there is free, nor
+        is changing twice in a row (changed is as for _dijkstra).
+        """
+        best, parent, settled = self._dijkstra(start, end, by_time, source, cost,
+                                               banned, banned_states, cut, changed)
+        s = settled[-1]
+        if s == SOURCE or self.station_of[s] != end:
+            return None
+        path = []
+        while s is not None:
+            path.append(s)
+            s = parent[s]
+        return path[::-1], best[settled[-1]]
+
+    def tree(self, start, minimize='time'):
+        """Best journeys from station id start to every station at once.
+
+        Returns (best, parent, settled) as for a search with no end:
+        parent links lead back to SOURCE and parents settle before their
+        children.
+        """
+        return self._dijkstra(start, None, _by_time(minimize))
+
+    def _cut(self, edges):
+        """State moves riding any of the (u, v) station edges."""
+        at = self.states_at
+        return {(s, t) for u, v in edges for s in at.get(u, ()) for t in at.get(v, ())}
+
+    def search(self, start, end, minimize='time', closed=frozenset(), cut=frozenset()):
+        """(states, minutes, transfers) of the best journey between station ids, or None.
+
+        minimize='time' ranks by travel time and then transfers,
+        'transfers' the other way round.  The journey avoids closed
+        station ids and the (u, v) station edges in cut.
+        """
+        found = self._search(start, end, _by_time(minimize), banned=closed, cut=self._cut(cut))
+        if found is None:
+            return None
+        path, (minutes, transfers) = found
+        return path[1:], minutes, transfers
+
+    def k_best(self, start, end, k, minimize='time', closed=frozenset(), cut=frozenset()):
+        """Up to k loopless journeys between station ids, best first.
+
+        Yen's algorithm on the state graph: each new journey deviates from
+        an accepted one at a spur state, reusing the accepted root.  Spurs
+        are only taken at or after the point where the journey being
+        extended itself deviated, since earlier spurs were already tried.
+        Journeys that differ only in their states, not in the legs ridden,
+        count once.  closed and cut are as for search.  Returns [(states, minutes, transfers)].
+        """
+        by_time = _by_time(minimize)
+        key = (lambda c: c) if by_time else (lambda c: (c[1], c[0]))
+        closed, base_cut = set(closed), self._cut(cut)
+        found = self._search(start, end, by_time, banned=closed, cut=base_cut)
+        if found is None:
+            return []
+        accepted = [(found[0], found[1], 0)]
+        seen = {self._ridden(found[0][1:])}
+        candidates = []
+        while len(accepted) < k:
+            prev, _, dev = accepted[-1]
+            costs = [(0.0, 0)]
+            for s, t in zip(prev, prev[1:]):
+                m, x = self._move_cost(s, t, start)
+                costs.append((costs[-1][0] + m, costs[-1][1] + x))
+            for i in range(dev, len(prev) - 1):
+                root = prev[:i + 1]
+                spur = root[-1]
+                cut = base_cut | {(spur, path[i + 1]) for path, _, _ in accepted if path[:i + 1] == root}
+                here = None if spur == SOURCE else self.station_of[spur]
+                banned = closed | ({self.station_of[s] for s in root[1:]} - {here})
+                changed = i > 1 and self.station_of[root[-2]] == here
+                spur_found = self._search(start, end, by_time, spur, costs[i], banned, set(root[:-1]), cut, changed)
+                if spur_found is None:
+                    continue
+                path = root[:-1] + spur_found[0]
+                ridden = self._ridden(path[1:])
+                if ridden is None or ridden in seen or not _loopless([self.station_of[s] for s in path[1:]]):
+                    continue
+                seen.add(ridden)
+                heappush(candidates, (key(spur_found[1]), len(seen), path, spur_found[1], i))
+            if not candidates:
+                break
+            _, _, path, cost, i = heappop(candidates)
+            accepted.append((path, cost, i))
+        return [(path[1:], minutes, transfers) for path, (minutes, transfers), _ in accepted]
+
+    def _ridden(self, states):
+        """The (line, stations) legs of a state path as a tuple, or None if
+        some leg rides no segment, as when changing line twice in a row."""
+        runs = []
+        for s in states:
+            if runs and runs[-1][0] == self.line_of[s]:
+                runs[-1][1].append(self.station_of[s])
+            else:
+                runs.append((self.line_of[s], [self.station_of[s]]))
+        if any(len(ids) < 2 for _, ids in runs):
+            return None
+        return tuple((line, tuple(ids)) for line, ids in runs)
+
+    def legs(self, states):
+        """[(line name, [station names])] for a state path, one entry per line ridden."""
+        legs = []
+        for s in states:
+            line, name = self.line_names[self.line_of[s]], self.cg.names[self.station_of[s]]
+            if legs and legs[-1][0] == line:
+                legs[-1][1].append(name)
+            else:
+                legs.append((line, [name]))
+        return [leg for leg in legs if len(leg[1]) > 1] or legs[:1]
+
+_line_graphs = {}
+
+def line_graph(city):
+    """The city's LineGraph, or None if its data has no lines."""
+    if city not in _line_graphs:
+        lines = load_city(city).lines
+        _line_graphs[city] = LineGraph(compiled(city), network(city)[1], lines) if lines else None
+    return _line_graphs[city]
+
+def _journey(lg, states, minutes, transfers):
+    legs = lg.legs(states)
+    stations = [legs[0][1][0]]
+    for _, names in legs:
+        stations.extend(names[1:])
+    return stations, legs, minutes, transfers
+
+def alternatives(city, start, end, k=3, minimize='time'):
+    """Up to k journeys between station names, best first, each as
+    (stations, legs, minutes, transfers).
+
+    Journeys avoid the city's closures (see disruption.py).  Cities
+    without line data get a single untagged leg along the fastest
+    station route.
+    """
+    lg = line_graph(city)
+    closures = disruption(city)
+    if lg is None:
+        stations = closures.find_route(start, end)
+        if stations is None:
+            return []
+        return [(stations, [(None, stations)], network(city)[1].path_minutes(stations), 0)]
+    i, j = lg.cg.ids(start, end)
+    if i is None or j is None:
+        return []
+    return [_journey(lg, *found) for found in lg.k_best(i, j, k, minimize, closures.closed, closures.cut)]
+
+def plan(city, start, end, minimize='time'):
+    """(stations, legs, minutes, transfers) for the best journey between station names, or None."""
+    found = alternatives(city, start, end, 1, minimize)
+    return found[0] if found else None
+
+def leg_label(leg):
+    """'Green: A → B (7 stops)' for one leg."""
+    line, names = leg
+    stops = len(names) - 1
+    text = f"{names[0]} → {names[-1]} ({stops} stop{'s' if stops != 1 else ''})"
+    return f"{line}: {text}" if line else text
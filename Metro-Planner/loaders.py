@@ -0,0 +1,174 @@
+"""Assets the pages share, loaded once per process.
+
+    python loaders.py --runs 10 --users 4    # cold vs warm rerun latency
+
+Streamlit re-executes a page on every interaction, so anything decoded or
+derived from graph.py is cached here: images and networks with
+st.cache_resource (one shared object) and small derived lists with
+st.cache_data.  Large maps are shown from a display-sized rendition kept
+in renditions/, so a new process does not decode the full-size JPEG.
+"""
+import argparse
+import statistics
+import threading
+import time
+from pathlib import Path
+
+import streamlit as st
+from PIL import Image
+
+from graph_check import component_stats
+from route_table import network
+
+BASE_DIR = Path(__file__).parent
+IMAGE_DIR = BASE_DIR / "images"
+RENDITION_DIR = BASE_DIR / "renditions"
+# st.image never shows a map wider than the page, so wider pixels are wasted
+MAP_WIDTH = 1600
+
+@st.cache_resource(show_spinner=False)
+def load_image(name):
+    """images/<name>, decoded once per process; None if it is missing."""
+    try:
+        with Image.open(IMAGE_DIR / name) as img:
+            img.load()
+            return img.copy()
+    except OSError:
+        return None
+
+def _rendition(src, width):
+    """Path of src scaled to width, rebuilt when src is newer."""
+    dst = RENDITION_DIR / f"{src.stem}-{width}{src.suffix}"
+    if dst.exists() and dst.stat().st_mtime >= src.stat().st_mtime:
+        return dst
+    with Image.open(src) as img:
+        # JPEG can decode straight to a smaller scale, which is most of the saving
+        img.draft(img.mode, (width, width * img.height // img.width))
+        img = img.convert("RGB") if img.mode not in ("RGB", "L") else img
+        if img.width > width:
+            img = img.resize((width, round(img.height * width / img.width)), Image.LANCZOS)
+        RENDITION_DIR.mkdir(exist_ok=True)
+        tmp = dst.with_name(dst.name + ".tmp")
+        img.save(tmp, format="JPEG", quality=85, optimize=True)
+    tmp.replace(dst)
+    return dst
+
+@st.cache_resource(show_spinner=False)
+def load_map(name, width=MAP_WIDTH):
+    """images/<name> at display size, or None if it is missing."""
+    src = IMAGE_DIR / name
+    if not src.exists():
+        return None
+    with Image.open(src) as img:
+        small = img.width <= width
+    if small:
+        return load_image(name)
+    try:
+        path = _rendition(src, width)
+    except OSError:
+        path = src
+    with Image.open(path) as img:
+        img.load()
+        return img.copy()
+
+@st.cache_resource(show_spinner=False)
+def city_network(city):
+    """(graph, Weights) from route_table.network, shared by every session."""
+    return network(city)
+
+@st.cache_data(show_spinner=False)
+def station_names(city):
+    """The city's stations in alphabetical order."""
+    return sorted(city_network(city)[0])
+
+@st.cache_data(show_spinner=False)
+def network_stats(city):
+    return component_stats(city_network(city)[0])
+
+class RerunTimes:
+    """Script run times of each page in this process.
+
+    The first run of a page is cold (caches empty); later runs are warm.
+    Sessions share one instance, hence the lock.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.cold = {}
+        self.warm = {}
+
+    def record(self, page, seconds):
+        with self.lock:
+            if page not in self.cold:
+                self.cold[page] = seconds
+                return "cold"
+            self.warm.setdefault(page, []).append(seconds)
+            return "warm"
+
+    def summary(self, page):
+        """(cold ms, warm median ms, warm runs) for a page, None where unknown."""
+        with self.lock:
+            cold, warm = self.cold.get(page), list(self.warm.get(page, ()))
+        return (None if cold is None else cold * 1000,
+                statistics.median(warm) * 1000 if warm else None, len(warm))
+
+@st.cache_resource(show_spinner=False)
+def rerun_times():
+    return RerunTimes()
+
+class PageTimer:
+    """Time one run of a page script and report it in the sidebar.
+
+    Start it at the top of the page and call done() at the end; runs cut
+    short by st.stop() are not recorded.
+    """
+
+    def __init__(self, page):
+        self.page = page
+        self.start = time.perf_counter()
+
+    def done(self):
+        seconds = time.perf_counter() - self.start
+        kind = rerun_times().record(self.page, seconds)
+        cold, warm, runs = rerun_times().summary(self.page)
+        text = f"This run: {seconds * 1000:.0f} ms ({kind})  \nFirst run: {cold:.0f} ms"
+        if warm is not None:
+            text += f"  \nWarm median: {warm:.0f} ms over {runs} run{'s' if runs != 1 else ''}"
+        st.sidebar.caption(text)
+
+def _bench(pages, runs, users):
+    """Time page runs in fresh AppTest sessions sharing this process's caches.
+
+    AppTest drives one script thread at a time, so the sessions take turns
+    rather than running at once; what they share is the cache, which is
+    what decides whether a new user's first run is cold or warm.
+    """
+    from streamlit.testing.v1 import AppTest
+
+    for page in pages:
+        sessions = [AppTest.from_file(str(BASE_DIR / page), default_timeout=120) for _ in range(users)]
+        times = []
+        for _ in range(runs):
+            for at in sessions:
+                start = time.perf_counter()
+                at.run()
+                times.append((time.perf_counter() - start) * 1000)
+        cold, first, warm = times[0], times[1:users], sorted(times[users:])
+        text = f"{page}: cold {cold:.0f} ms"
+        if first:
+            text += f", other sessions' first run {statistics.median(first):.0f} ms"
+        if warm:
+            text += f", warm reruns median {statistics.median(warm):.0f} ms, max {warm[-1]:.0f} ms"
+        print(text + f" ({users} sessions x {runs} runs)")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure cold and warm page runs.")
+    parser.add_argument('--page', action='append',
+                        help="page script to time (repeatable, default: every page)")
+    parser.add_argument('--runs', type=int, default=5, help="runs per session")
+    parser.add_argument('--users', type=int, default=4, help="sessions sharing the caches")
+    args = parser.parse_args(argv)
+    _bench(args.page or ["Bengaluru.py", "pages/Delhi.py"], args.runs, args.users)
+
+if __name__ == "__main__":
+    main()
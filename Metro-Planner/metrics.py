@@ -0,0 +1,46 @@
+"""Distance, time and fare of a journey, shared by the pages and batch tools.
+
+A journey is given as its station path or as the legs lines.plan
+returns: [(line, [station names])], one entry per line ridden.
+"""
+from bisect import bisect_left
+
+from lines import DEFAULT_TRANSFER_MINUTES
+from route_table import network
+
+# (up to km, fare) slabs in rupees; a leg past the last limit pays FARE_CAPS
+FARE_SLABS = {
+    # simple slab; adjust as needed to match current BMRCL fare matrix
+    'bengaluru': ((2, 10), (5, 15), (10, 25), (15, 35), (20, 45)),
+    # DMRC Monday-Saturday slabs
+    'delhi': ((2, 10), (5, 20), (12, 30), (21, 40), (32, 50)),
+}
+FARE_CAPS = {'bengaluru': 60, 'delhi': 60}
+# cities that charge each line ridden as its own fare; the rest price a
+# journey by its total distance (DMRC fares go by the whole trip)
+PER_LEG_FARES = {'bengaluru'}
+
+def calc_distance_km(city, path):
+    return network(city)[1].path_km(path)
+
+def calc_time_minutes(city, legs):
+    # run time per segment + dwell per stop + a transfer at every change of line
+    weights = network(city)[1]
+    rides = sum(weights.ride_minutes(names) for _, names in legs)
+    changes = sum(weights.transfers.get(names[0], DEFAULT_TRANSFER_MINUTES) for _, names in legs[1:])
+    return int(round(rides + changes))
+
+def calc_fare(city, distance_km):
+    slabs = FARE_SLABS[city]
+    i = bisect_left([km for km, _ in slabs], distance_km)
+    return slabs[i][1] if i < len(slabs) else FARE_CAPS[city]
+
+def calc_fare_splitted(city, legs):
+    # each leg is its own fare segment, split where the route changes line
+    return sum(calc_fare(city, calc_distance_km(city, names)) for _, names in legs)
+
+def calc_journey_fare(city, legs):
+    # the fare the city actually charges for the journey
+    if city in PER_LEG_FARES:
+        return calc_fare_splitted(city, legs)
+    return calc_fare(city, sum(calc_distance_km(city, names) for _, names in legs))
@@ -0,0 +1,153 @@
+"""Origin-destination matrices for a whole network.
+
+    python od_matrix.py --city delhi -o delhi_od.parquet
+    python od_matrix.py --city bengaluru -o bengaluru_od.csv -j 4
+    python od_matrix.py --city delhi -o delhi_od.npy
+
+For every ordered pair of stations: the fewest stops between them (a BFS
+from each origin), and the time, changes, distance and fare of the
+fastest line-aware journey (lines.plan's choice), priced with metrics.py.
+A Dijkstra tree per origin covers every destination at once and origins
+are shared out across worker processes.
+
+CSV and Parquet files hold one row per pair.  An .npy file holds a
+(len(FIELDS), N, N) float array, NaN where a pair is unreachable, and the
+station names of its rows and columns go to a .txt file beside it.
+"""
+import argparse
+import os
+import sys
+import time
+from multiprocessing import Pool
+from pathlib import Path
+
+from lines import SOURCE, line_graph
+from metrics import PER_LEG_FARES, calc_fare
+from route_table import CITIES, compiled, network
+from routing import fastest_path
+
+FIELDS = ('hops', 'minutes', 'transfers', 'distance_km', 'fare')
+OUTPUTS = ('.csv', '.parquet', '.npy')
+
+def bfs_hops(cg, start):
+    """Fewest stops from station id start to every station, -1 if unreachable."""
+    hops = [-1] * len(cg)
+    hops[start] = 0
+    frontier = [start]
+    while frontier:
+        nxt = []
+        for u in frontier:
+            for k in range(cg.offsets[u], cg.offsets[u + 1]):
+                v = cg.neighbors[k]
+                if hops[v] < 0:
+                    hops[v] = hops[u] + 1
+                    nxt.append(v)
+        frontier = nxt
+    return hops
+
+def od_row(city, start):
+    """One origin's row: a list of (hops, minutes, transfers, km, fare) per
+    destination id, None where unreachable."""
+    cg, weights = compiled(city), network(city)[1]
+    hops = bfs_hops(cg, start)
+    row = [None] * len(cg)
+    row[start] = (0, 0.0, 0, 0.0, 0)
+    lg = line_graph(city)
+    if lg is None:
+        # no lines to change between: one fare over the fastest station route
+        for v in range(len(cg)):
+            if v != start and hops[v] >= 0:
+                path = cg.path_names(fastest_path(cg, start, v))
+                km = weights.path_km(path)
+                row[v] = (hops[v], weights.path_minutes(path), 0, km, calc_fare(city, km))
+        return row
+    best, parent, settled = lg.tree(start)
+    per_leg = city in PER_LEG_FARES
+    station_of, line_of, names = lg.station_of, lg.line_of, cg.names
+    # per state: (km on the current leg, km before it, fare of finished legs)
+    acc = {SOURCE: (0.0, 0.0, 0)}
+    for s in settled[1:]:
+        p = parent[s]
+        leg_km, done_km, fare = acc[p]
+        if p == SOURCE:
+            acc[s] = (0.0, 0.0, 0)
+        elif line_of[p] == line_of[s]:
+            acc[s] = (leg_km + weights.segment_km(names[station_of[p]], names[station_of[s]]), done_km, fare)
+        else:
+            acc[s] = (0.0, done_km + leg_km, fare + calc_fare(city, leg_km))
+        v = station_of[s]
+        if v != start and row[v] is None:
+            # the first state settled at a station is its best journey
+            leg_km, done_km, fare = acc[s]
+            minutes, transfers = best[s]
+            km = done_km + leg_km
+            row[v] = (hops[v], minutes, transfers, km,
+                      fare + calc_fare(city, leg_km) if per_leg else calc_fare(city, km))
+    return row
+
+def _rows(args):
+    city, starts = args
+    return [(i, od_row(city, i)) for i in starts]
+
+def od_matrix(city, processes=None):
+    """(station names, rows) where rows[i][j] is od_row(city, i)[j]."""
+    n = len(compiled(city))
+    processes = processes or os.cpu_count() or 1
+    if processes == 1:
+        return compiled(city).names, [od_row(city, i) for i in range(n)]
+    with Pool(processes) as pool:
+        chunks = [(city, range(k, n, processes)) for k in range(processes)]
+        rows = [None] * n
+        for part in pool.imap_unordered(_rows, chunks):
+            for i, row in part:
+                rows[i] = row
+    return compiled(city).names, rows
+
+def write_matrix(names, rows, path):
+    path = Path(path)
+    if path.suffix == '.npy':
+        import numpy as np
+
+        out = np.full((len(FIELDS), len(names), len(names)), np.nan)
+        for i, row in enumerate(rows):
+            for j, cell in enumerate(row):
+                if cell is not None:
+                    out[:, i, j] = cell
+        np.save(path, out)
+        path.with_suffix('.txt').write_text("\n".join(names) + "\n", encoding="utf-8")
+        return
+    import pandas as pd
+
+    records = [(names[i], names[j], *cell) for i, row in enumerate(rows)
+               for j, cell in enumerate(row) if cell is not None]
+    df = pd.DataFrame.from_records(records, columns=('origin', 'destination') + FIELDS)
+    df['minutes'] = df['minutes'].round(2)
+    df['distance_km'] = df['distance_km'].round(3)
+    if path.suffix == '.parquet':
+        df.to_parquet(path, index=False)
+    elif path.suffix == '.csv':
+        df.to_csv(path, index=False)
+    else:
+        raise ValueError(f"unsupported output {path.suffix!r}: use one of {', '.join(OUTPUTS)}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write a city's origin-destination matrix.")
+    parser.add_argument('--city', choices=CITIES, required=True)
+    parser.add_argument('-o', '--output', required=True, help="a .csv, .parquet or .npy file")
+    parser.add_argument('-j', '--processes', type=int, default=None,
+                        help="worker processes (default: one per CPU, 1 runs in-process)")
+    args = parser.parse_args(argv)
+    if Path(args.output).suffix not in OUTPUTS:
+        parser.error(f"--output must end in one of {', '.join(OUTPUTS)}")
+    start = time.perf_counter()
+    names, rows = od_matrix(args.city, args.processes)
+    computed = time.perf_counter() - start
+    try:
+        write_matrix(names, rows, args.output)
+    except (ImportError, ValueError) as e:
+        sys.exit(f"cannot write {args.output}: {e}")
+    print(f"{args.city}: {len(names)} x {len(names)} pairs in {computed:.2f}s, "
+          f"written in {time.perf_counter() - start - computed:.2f}s -> {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,10 @@
 import streamlit as st
-from graph import delhi
+from loaders import PageTimer, load_image, load_map, station_names
+from lines import alternatives
+from metrics import calc_journey_fare
 import pandas as pd
-from PIL import Image
+
+timer = PageTimer('Delhi')
 
 st.set_page_config(
     page_title='Metro Planner',
@@ -14,12 +17,15 @@ st.set_page_config(
     }
 )
 
-st.sidebar.image('images/delhi_metro.png')
-stations = delhi.keys()
+logo = load_image('delhi_metro.png')
+if logo is not None:
+    st.sidebar.image(logo)
+stations = station_names('delhi')
 
 st.markdown("<h1 style='text-align: center; color: white;'>Delhi Metro Travel Planner</h1>", unsafe_allow_html=True)
-metro_map = Image.open('images/delhi_map.jpg')
-st.image(metro_map)
+metro_map = load_map('delhi_map.jpg')
+if metro_map is not None:
+    st.image(metro_map)
 st.markdown("<h2 style='text-align: center; color: white;'>Enter Station Names</h2>", unsafe_allow_html=True)
 
 st.markdown(
@@ -41,39 +47,50 @@ source = st.selectbox('Source',stations)
 st.write('### Destination')
 dest = st.selectbox('Destination',stations)
         
-def dfs(delhi, s, e, minlength=-1, path=[]):
-  path = path + [s]
-  if s == e: return path
-  if s not in delhi: return None
-  shortest = None
-  for node in delhi[s]:
-    if node not in path:
-      if minlength==-1 or len(path)<(minlength-1):
-        new = dfs(delhi, node, e, minlength, path)
-        if new:
-          if not shortest or len(new) < len(shortest):
-            shortest = new
-            minlength = len(new)  
-  return shortest        
-        
+objectives = {'Fastest': 'time', 'Fewest changes': 'transfers'}
+objective = st.radio('Optimise for', tuple(objectives), horizontal=True)
+options = st.slider('Routes to compare', 1, 5, 3)
+
 start=source
 end=dest
 
+def legs_table(legs):
+  output = pd.DataFrame({'Line' : [line for line, _ in legs],
+                         'From' : [names[0] for _, names in legs],
+                         'To' : [names[-1] for _, names in legs],
+                         'Stops' : [len(names) - 1 for _, names in legs]})
+  output.index += 1
+  return output
+
 button1 = st.button('Search Route')
 
 if st.session_state.get('button') != True:
     st.session_state['button'] = button1
 
 if st.session_state['button'] == True:
-  path=dfs(delhi,start,end)
-  output = pd.DataFrame({'Station Name' : path})
-  output.index += 1
+  if start == end:
+    st.info('Source and destination are the same. Please pick different stations.')
+    st.stop()
+  journeys=alternatives('delhi',start,end,options,objectives[objective])
+  if not journeys:
+    st.error('No route found between the selected stations.')
+    st.stop()
+  path, legs, minutes, transfers = journeys[0]
   st.write('####',start,' to ', end, 'Route : ')
-  st.write(output)      
+  st.write(legs_table(legs))
+  st.caption(f'{len(path)} stations, {transfers} change(s), about {round(minutes)} min, '
+             f'fare ₹{calc_journey_fare("delhi", legs)}')
+  if len(journeys) > 1:
+    st.write('#### Other options')
+    st.write(pd.DataFrame({'Via' : [' → '.join(line for line, _ in l) for _, l, _, _ in journeys],
+                           'Time (min)' : [round(m) for _, _, m, _ in journeys],
+                           'Changes' : [x for _, _, _, x in journeys],
+                           'Fare (₹)' : [calc_journey_fare('delhi', l) for _, l, _, _ in journeys],
+                           'Stations' : [len(p) for p, _, _, _ in journeys]},
+                          index=range(1, len(journeys) + 1)))
   if st.button('Return Route'):
-    path.reverse()
-    output2 = pd.DataFrame({'Station Name' : path})
-    output2.index += 1
     st.write('####',end,' to ', start, 'Route : ')
-    st.write(output2)
+    st.write(legs_table([(line, names[::-1]) for line, names in reversed(legs)]))
     st.session_state['button'] = False
+
+timer.done()
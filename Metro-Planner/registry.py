@@ -0,0 +1,172 @@
+"""City networks, loaded one at a time from data files.
+
+    python registry.py                 # rewrite cities/<city>.json from graph.py
+    python registry.py --startup       # time each page's first run in a fresh process
+
+graph.py stays the file people edit.  Each of its cities is exported to
+cities/<city>.json, which holds the normalized graph with stations as
+integer ids, the weights, lines and alternative names.  A page loads
+only the file for the city it shows, and only on first use; graph.py is
+read again only when it has changed since the file was written (its hash
+is stored in the file).  A city with a data file and nothing in graph.py
+works too, so new networks can be added as files alone.
+"""
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent
+CITY_DIR = BASE_DIR / "cities"
+GRAPH_SOURCE = BASE_DIR / "graph.py"
+# cities defined in graph.py
+SOURCE_CITIES = ('bengaluru', 'delhi')
+FORMAT = 1
+
+class City:
+    """One network as the rest of the planner uses it.
+
+    graph is the normalized adjacency dict; weights a routing.Weights;
+    lines maps line names to stations in running order (empty if the
+    data has none); names maps alternative spellings and everyday names
+    to stations.
+    """
+    __slots__ = ('name', 'graph', 'weights', 'lines', 'names')
+
+    def __init__(self, name, graph, weights, lines, names):
+        self.name, self.graph, self.weights, self.lines, self.names = name, graph, weights, lines, names
+
+def cities():
+    """Every city with a data file or an entry in graph.py."""
+    found = dict.fromkeys(SOURCE_CITIES)
+    found.update(dict.fromkeys(sorted(p.stem for p in CITY_DIR.glob("*.json"))))
+    return tuple(found)
+
+def city_file(city):
+    return CITY_DIR / f"{city}.json"
+
+def _source_hash():
+    try:
+        return hashlib.sha256(GRAPH_SOURCE.read_bytes()).hexdigest()
+    except OSError:
+        return None
+
+def export_city(city):
+    """The data-file form of a graph.py city, as a dict."""
+    import graph as networks
+    from graph_check import dict_entries, normalize
+
+    attr = lambda suffix, default=None: getattr(networks, f"{city}_{suffix}", default)
+    graph = normalize(dict_entries(city, GRAPH_SOURCE), attr("aliases"))
+    stations = list(graph)
+    index = {s: i for i, s in enumerate(stations)}
+    names = {name: station for name, station in attr("aliases").items() if station is not None}
+    names.update(attr("nicknames", {}))
+    lines = {}
+    for line, stops in (attr("lines") or {}).items():
+        unknown = [s for s in stops if s not in index]
+        if unknown:
+            raise ValueError(f"{city} line {line!r} has unknown station {unknown[0]!r}")
+        lines[line] = [index[s] for s in stops]
+    return {
+        'format': FORMAT,
+        'source': _source_hash(),
+        'stations': stations,
+        'adjacency': [[index[b] for b in graph[a]] for a in stations],
+        'default_km': attr("default_km"),
+        'km': [[index[a], index[b], km] for (a, b), km in attr("km").items()],
+        'transfers': attr("transfers"),
+        'lines': lines,
+        'names': names,
+    }
+
+def write_city(city, data=None):
+    data = data or export_city(city)
+    CITY_DIR.mkdir(exist_ok=True)
+    path = city_file(city)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(data, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+    tmp.replace(path)
+    return path
+
+def _read(city):
+    """The city's data dict, re-exported from graph.py when the file is
+    missing or older than graph.py."""
+    try:
+        data = json.loads(city_file(city).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        data = None
+    if city in SOURCE_CITIES:
+        current = _source_hash()
+        if data is None or data.get('format') != FORMAT or (current and data.get('source') != current):
+            data = export_city(city)
+            try:
+                write_city(city, data)
+            except OSError:
+                pass  # read-only checkout: use the fresh export for this process
+    if data is None:
+        raise KeyError(f"unknown city {city!r}")
+    return data
+
+_cities = {}
+load_times = {}
+
+def load_city(city):
+    """The city's City, read on first use and kept for the process."""
+    if city not in _cities:
+        from routing import Weights
+
+        start = time.perf_counter()
+        data = _read(city)
+        stations = data['stations']
+        graph = {s: [stations[j] for j in row] for s, row in zip(stations, data['adjacency'])}
+        weights = Weights(data['default_km'],
+                          {(stations[a], stations[b]): km for a, b, km in data['km']},
+                          data['transfers'])
+        lines = {line: [stations[i] for i in stops] for line, stops in data['lines'].items()}
+        _cities[city] = City(city, graph, weights, lines, data['names'])
+        load_times[city] = time.perf_counter() - start
+    return _cities[city]
+
+def _startup(pages):
+    """Time each page's first run in its own process, and what it loaded."""
+    probe = (
+        "import sys, time, json\n"
+        "start = time.perf_counter()\n"
+        "from streamlit.testing.v1 import AppTest\n"
+        "AppTest.from_file(sys.argv[1], default_timeout=120).run()\n"
+        "elapsed = time.perf_counter() - start\n"
+        "import registry\n"
+        "print(json.dumps([elapsed, registry.load_times, 'graph' in sys.modules]))\n"
+    )
+    for page in pages:
+        out = subprocess.run([sys.executable, "-c", probe, str(BASE_DIR / page)], cwd=BASE_DIR,
+                             env={**os.environ, 'PYTHONPATH': str(BASE_DIR)},
+                             capture_output=True, text=True, check=True).stdout
+        elapsed, loads, imported_graph = json.loads(out.strip().splitlines()[-1])
+        loaded = ", ".join(f"{city} {t * 1000:.1f} ms" for city, t in loads.items()) or "none"
+        print(f"{page}: first run {elapsed * 1000:.0f} ms; cities loaded: {loaded}"
+              f"{'; graph.py imported' if imported_graph else ''}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export graph.py cities to data files.")
+    parser.add_argument('--city', choices=SOURCE_CITIES, action='append',
+                        help="only export this city (repeatable, default: all)")
+    parser.add_argument('--startup', action='store_true',
+                        help="time each page's first run instead of exporting")
+    args = parser.parse_args(argv)
+    if args.startup:
+        _startup(["Bengaluru.py", "pages/Delhi.py"])
+        return
+    for city in args.city or SOURCE_CITIES:
+        start = time.perf_counter()
+        path = write_city(city)
+        print(f"{city} -> {path.relative_to(BASE_DIR)} ({path.stat().st_size / 1024:.1f} KiB) "
+              f"in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""Precomputed all-pairs route tables for the metro graphs.
+
+    python route_table.py            # rebuild every tables/<city>.routes
+
+A table file is a fixed header, the station names and two N x N uint16
+arrays: the next station on the fastest route from station i to station j,
+and the number of stops on that route.  The file is memory-mapped on
+first use and a route lookup is a walk along next hops, with no graph
+search.  Tables answer station-level routes only: the pages plan
+line-aware journeys with lines.py, which reads a table (through
+disruption.py) only for a city without line data.
+"""
+import argparse
+import hashlib
+import json
+import mmap
+import struct
+import time
+from array import array
+from heapq import heappop, heappush
+from pathlib import Path
+
+from registry import cities, load_city
+from routing import compile_graph, fastest_path
+
+TABLE_DIR = Path(__file__).parent / "tables"
+CITIES = cities()
+
+MAGIC = b'MTRT'
+VERSION = 1
+# magic, version, n stations, names length, graph and weights digest
+HEADER = struct.Struct('<4sHxxII32s')
+UNREACHABLE = 0xFFFF
+
+_networks = {}
+
+def network(city):
+    """(graph, Weights) for a city, from its registry data file.
+
+    The graph is graph_check.normalize's undirected form of the city's
+    dict in graph.py, not the imported dict itself.
+    """
+    if city not in _networks:
+        data = load_city(city)
+        _networks[city] = (data.graph, data.weights)
+    return _networks[city]
+
+def compiled(city):
+    """The city's CompiledGraph, built on first use."""
+    return compile_graph(*network(city))
+
+def graph_digest(graph, weights):
+    """Hash of the adjacency and weights; a table is stale when it changes."""
+    return hashlib.sha256(json.dumps([list(graph.items()), weights.key()]).encode()).digest()
+
+def build_table(cg):
+    """(next_hop, hops) for a CompiledGraph, row i holding routes out of station i.
+
+    One Dijkstra per destination over the reverse edges fills a whole
+    column, so every route in the table follows the same fastest-route
+    tree.  Costs match routing.fastest_path, transfers included.
+    """
+    n = len(cg)
+    if n >= UNREACHABLE:
+        raise ValueError(f"too many stations for a uint16 table: {n}")
+    next_hop = array('H', [UNREACHABLE]) * (n * n)
+    hops = array('H', [UNREACHABLE]) * (n * n)
+    offsets, neighbors, minutes, transfer = cg.rev_offsets, cg.rev_neighbors, cg.rev_minutes, cg.transfer
+    for j in range(n):
+        next_hop[j * n + j] = j
+        hops[j * n + j] = 0
+        best = [float('inf')] * n
+        best[j] = 0.0
+        heap = [(0.0, j)]
+        while heap:
+            t, v = heappop(heap)
+            if t > best[v]:
+                continue
+            if v != j:
+                t += transfer[v]
+            for k in range(offsets[v], offsets[v + 1]):
+                u = neighbors[k]
+                nt = t + minutes[k]
+                if nt < best[u]:
+                    best[u] = nt
+                    hops[u * n + j] = hops[v * n + j] + 1
+                    next_hop[u * n + j] = v
+                    heappush(heap, (nt, u))
+    return next_hop, hops
+
+def write_table(graph, weights, path):
+    cg = compile_graph(graph, weights)
+    names = cg.names
+    next_hop, hops = build_table(cg)
+    blob = "\n".join(names).encode()
+    blob += b"\0" * (-(HEADER.size + len(blob)) % 8)
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(names), len(blob), graph_digest(graph, weights)))
+        f.write(blob)
+        f.write(next_hop.tobytes())
+        f.write(hops.tobytes())
+    tmp.replace(path)
+    return len(names)
+
+class RouteTable:
+    """A memory-mapped table written by write_table."""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self.buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, n, names_len, self.digest = HEADER.unpack_from(self.buf)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} route table")
+        start = HEADER.size + names_len
+        if len(self.buf) != start + 4 * n * n:
+            raise ValueError(f"{path} is truncated")
+        self.names = self.buf[HEADER.size:start].rstrip(b"\0").decode().split("\n")
+        self.n = n
+        view = memoryview(self.buf)
+        self.next_hop = view[start:start + 2 * n * n].cast('H')
+        self.hop_count = view[start + 2 * n * n:].cast('H')
+
+    def route(self, i, j):
+        """Station ids from station i to station j, or None if there is no route.
+
+        Ids are those of the CompiledGraph the table was built from.
+        """
+        n, nxt = self.n, self.next_hop
+        if nxt[i * n + j] == UNREACHABLE:
+            return None
+        path = [i]
+        while i != j:
+            i = nxt[i * n + j]
+            path.append(i)
+        return path
+
+    def hops(self, i, j):
+        """Stops between station ids i and j, or None if there is no route."""
+        h = self.hop_count[i * self.n + j]
+        return None if h == UNREACHABLE else h
+
+def table_path(city):
+    return TABLE_DIR / f"{city}.routes"
+
+_tables = {}
+
+def load_table(city):
+    """The city's table, mapped on first use; None if missing or built from other data."""
+    if city not in _tables:
+        try:
+            table = RouteTable(table_path(city))
+        except (OSError, ValueError):
+            table = None
+        if table is not None and table.digest != graph_digest(*network(city)):
+            table = None
+        _tables[city] = table
+    return _tables[city]
+
+def find_route(city, start, end):
+    """Fastest route between two station names, as names, or None.
+
+    Reads the precomputed table and falls back to a live search on the
+    compiled graph when the table is missing or stale.  This is the
+    station-level route, without lines or closures; the pages use
+    lines.alternatives instead.
+    """
+    cg = compiled(city)
+    i, j = cg.ids(start, end)
+    if i is None or j is None:
+        return None
+    table = load_table(city)
+    return cg.path_names(fastest_path(cg, i, j) if table is None else table.route(i, j))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the all-pairs route tables.")
+    parser.add_argument('--city', choices=CITIES, action='append',
+                        help="only rebuild this city (repeatable, default: all)")
+    args = parser.parse_args(argv)
+    for city in args.city or CITIES:
+        start = time.perf_counter()
+        n = write_table(*network(city), table_path(city))
+        print(f"{city}: {n} stations -> {table_path(city)} in {time.perf_counter() - start:.2f}s")
+
+if __name__ == "__main__":
+    main()
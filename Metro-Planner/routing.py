@@ -0,0 +1,189 @@
+"""Route search shared by the city pages.
+
+The adjacency dicts in graph.py (station name -> neighbouring station
+names) are compiled once into a CompiledGraph, and every search runs on
+its integer station ids; names are only looked up at the UI boundary.
+"""
+from array import array
+from heapq import heappop, heappush
+
+AVERAGE_SPEED_KMPH = 32      # typical metro average incl. dwell
+MIN_DWELL_SEC = 25           # per stop average dwell time
+
+class Weights:
+    """Segment lengths and interchange transfer times of one network.
+
+    km maps (a, b) station pairs, in either direction, to kilometres and
+    any other segment is default_km long.  transfers maps an interchange
+    to the minutes added when a route passes through it.
+    """
+
+    def __init__(self, default_km, km=None, transfers=None):
+        self.default_km = default_km
+        self.km = dict(km or {})
+        self.transfers = dict(transfers or {})
+
+    def segment_km(self, a, b):
+        km = self.km.get((a, b))
+        return self.km.get((b, a), self.default_km) if km is None else km
+
+    def segment_minutes(self, a, b):
+        """Running time over one segment plus the dwell at its far end."""
+        return self.segment_km(a, b) / AVERAGE_SPEED_KMPH * 60.0 + MIN_DWELL_SEC / 60.0
+
+    def path_km(self, path):
+        return sum(self.segment_km(a, b) for a, b in zip(path, path[1:]))
+
+    def ride_minutes(self, path):
+        """Segment times along path, without transfers."""
+        return sum(self.segment_minutes(a, b) for a, b in zip(path, path[1:]))
+
+    def path_minutes(self, path):
+        """Segment times plus a transfer at every interchange between the ends."""
+        return self.ride_minutes(path) + sum(self.transfers.get(s, 0) for s in path[1:-1])
+
+    def key(self):
+        """Plain data describing the weights, for hashing."""
+        return [self.default_km, sorted([a, b, km] for (a, b), km in self.km.items()),
+                sorted(self.transfers.items()), AVERAGE_SPEED_KMPH, MIN_DWELL_SEC]
+
+class CompiledGraph:
+    """A network with station names interned to dense ids and CSR adjacency.
+
+    The out-edges of station u are neighbors[offsets[u]:offsets[u + 1]]
+    and minutes holds each edge's segment time; rev_offsets, rev_neighbors
+    and rev_minutes are the same for in-edges, since graph.py does not list
+    every edge both ways.  transfer[u] is the interchange time at u.
+    """
+    __slots__ = ('names', 'index', 'offsets', 'neighbors', 'minutes',
+                 'rev_offsets', 'rev_neighbors', 'rev_minutes', 'transfer')
+
+    def __init__(self, graph, weights=None):
+        weights = weights or Weights(1.0)
+        names = dict.fromkeys(graph)
+        for neighbours in graph.values():
+            names.update(dict.fromkeys(neighbours))
+        self.names = list(names)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        edges = [(self.index[a], self.index[b]) for a, neighbours in graph.items() for b in neighbours]
+        self.offsets, self.neighbors, self.minutes = self._csr(edges, weights)
+        self.rev_offsets, self.rev_neighbors, self.rev_minutes = self._csr([(b, a) for a, b in edges], weights, True)
+        self.transfer = array('d', (weights.transfers.get(name, 0) for name in self.names))
+
+    def _csr(self, edges, weights, reverse=False):
+        """offsets, neighbors and segment minutes for edges grouped by source.
+
+        The sort is stable, so neighbours keep their graph.py order.
+        """
+        edges = sorted(edges, key=lambda e: e[0])
+        offsets = array('l', [0]) * (len(self.names) + 1)
+        for u, _ in edges:
+            offsets[u + 1] += 1
+        for u in range(len(self.names)):
+            offsets[u + 1] += offsets[u]
+        names = self.names
+        minutes = array('d', (weights.segment_minutes(names[v], names[u]) if reverse
+                              else weights.segment_minutes(names[u], names[v]) for u, v in edges))
+        return offsets, array('l', (v for _, v in edges)), minutes
+
+    def __len__(self):
+        return len(self.names)
+
+    def ids(self, *names):
+        """Station ids for names (None for unknown stations)."""
+        return tuple(self.index.get(name) for name in names)
+
+    def path_names(self, path):
+        return None if path is None else [self.names[u] for u in path]
+
+_compiled = {}
+
+def compile_graph(graph, weights=None):
+    """CompiledGraph for graph and weights, built once per pair of objects."""
+    key = (id(graph), id(weights))
+    cached = _compiled.get(key)
+    if cached is None or cached[0] is not graph or cached[1] is not weights:
+        cached = _compiled[key] = (graph, weights, CompiledGraph(graph, weights))
+    return cached[2]
+
+def _expand(frontier, offsets, neighbors, parent, other):
+    """Advance one BFS level; return (next frontier, meeting station or None)."""
+    nxt = []
+    for u in frontier:
+        for k in range(offsets[u], offsets[u + 1]):
+            v = neighbors[k]
+            if parent[v] < 0:
+                parent[v] = u
+                if other[v] >= 0:
+                    return nxt, v
+                nxt.append(v)
+    return nxt, None
+
+def shortest_path(cg, start, end):
+    """Fewest-stops path between two station ids as a list of ids, or None.
+
+    Bidirectional BFS: the smaller frontier is expanded a whole level at a
+    time and each side keeps parent pointers, so a query is linear in the
+    size of the graph and the path is only built once at the end.
+    """
+    if start == end:
+        return [start]
+    n = len(cg)
+    before, after = [-1] * n, [-1] * n
+    before[start], after[end] = start, end
+    fwd, bwd = [start], [end]
+    meet = None
+    while fwd and bwd and meet is None:
+        if len(fwd) <= len(bwd):
+            fwd, meet = _expand(fwd, cg.offsets, cg.neighbors, before, after)
+        else:
+            bwd, meet = _expand(bwd, cg.rev_offsets, cg.rev_neighbors, after, before)
+    if meet is None:
+        return None
+    path = [meet]
+    while path[-1] != start:
+        path.append(before[path[-1]])
+    path.reverse()
+    while path[-1] != end:
+        path.append(after[path[-1]])
+    return path
+
+def fastest_path(cg, start, end, banned=frozenset(), cut=frozenset()):
+    """Least estimated travel time path between two station ids, or None.
+
+    Dijkstra over a binary heap, with the same costs as
+    Weights.path_minutes: passing through an interchange between the ends
+    adds its transfer time.  The path never enters a station in banned
+    or takes a (u, v) edge in cut.
+    """
+    if start == end:
+        return [start]
+    offsets, neighbors, minutes, transfer = cg.offsets, cg.neighbors, cg.minutes, cg.transfer
+    best = [float('inf')] * len(cg)
+    parent = [-1] * len(cg)
+    best[start] = 0.0
+    heap = [(0.0, start)]
+    while heap:
+        t, u = heappop(heap)
+        if u == end:
+            break
+        if t > best[u]:
+            continue
+        if u != start:
+            t += transfer[u]
+        for k in range(offsets[u], offsets[u + 1]):
+            v = neighbors[k]
+            if v in banned or (u, v) in cut:
+                continue
+            nt = t + minutes[k]
+            if nt < best[v]:
+                best[v] = nt
+                parent[v] = u
+                heappush(heap, (nt, v))
+    else:
+        return None
+    path = [end]
+    while path[-1] != start:
+        path.append(parent[path[-1]])
+    path.reverse()
+    return path
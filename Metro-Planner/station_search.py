@@ -0,0 +1,133 @@
+"""Typo-tolerant station name search.
+
+    python station_search.py --city bengaluru majestic "rv raod"
+
+Every station is indexed under its own name and the other names in its
+registry data (graph.py's *_aliases misspellings and *_nicknames everyday
+names).  A query is matched
+against a prefix trie of the words in those names and a trigram index of
+whole names, so a lookup only touches names that share a prefix or a
+trigram with it.
+"""
+import argparse
+import re
+import time
+from collections import defaultdict
+
+from registry import load_city
+
+# least trigram similarity (Dice coefficient) a fuzzy match must reach
+MIN_SIMILARITY = 0.3
+
+def normalize_name(text):
+    """Upper case with punctuation folded to single spaces: 'dr.b.r.' -> 'DR B R'."""
+    return " ".join(re.sub(r"[^0-9A-Z]+", " ", text.upper()).split())
+
+def trigrams(key):
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class StationIndex:
+    """Search over station names and the names they are also known by.
+
+    names maps each searchable name to its station; a station is always
+    listed under its own name too.
+    """
+
+    def __init__(self, stations, names=None):
+        self.keys, self.stations, self.sizes = [], [], []
+        self.trie = {}
+        self.grams = defaultdict(list)
+        named = {station: station for station in stations}
+        named.update(names or {})
+        for name, station in named.items():
+            key = normalize_name(name)
+            if not key:
+                continue
+            k = len(self.keys)
+            self.keys.append(key)
+            self.stations.append(station)
+            grams = trigrams(key)
+            self.sizes.append(len(grams))
+            for g in grams:
+                self.grams[g].append(k)
+            # every word starts a prefix, so 'majestic' finds '..., MAJESTIC'
+            words = key.split()
+            for w in range(len(words)):
+                node = self.trie
+                for ch in " ".join(words[w:]):
+                    node = node.setdefault(ch, {})
+                    node.setdefault(None, set()).add(k)
+
+    def _prefixed(self, key):
+        node = self.trie
+        for ch in key:
+            node = node.get(ch)
+            if node is None:
+                return ()
+        return node[None]
+
+    def search(self, text, limit=5, cutoff=MIN_SIMILARITY):
+        """Up to limit (station, score) pairs for text, best first.
+
+        A name equal to the query scores 3, a name with a word starting
+        with it 2 plus how much of the name it covers, and anything else
+        its trigram similarity to the query, if at least cutoff.
+        """
+        key = normalize_name(text)
+        if not key:
+            return []
+        best = {}
+
+        def offer(k, score):
+            station = self.stations[k]
+            if score > best.get(station, 0.0):
+                best[station] = score
+
+        for k in self._prefixed(key):
+            offer(k, 3.0 if self.keys[k] == key else 2.0 + len(key) / len(self.keys[k]))
+        grams = trigrams(key)
+        shared = defaultdict(int)
+        for g in grams:
+            for k in self.grams.get(g, ()):
+                shared[k] += 1
+        for k, n in shared.items():
+            score = 2.0 * n / (len(grams) + self.sizes[k])
+            if score >= cutoff:
+                offer(k, score)
+        ranked = sorted(best.items(), key=lambda item: (-item[1], item[0]))
+        return ranked[:limit]
+
+    def best(self, text, cutoff=MIN_SIMILARITY):
+        """The closest station to text, or None."""
+        found = self.search(text, 1, cutoff)
+        return found[0][0] if found else None
+
+_indexes = {}
+
+def station_index(city):
+    """The city's StationIndex, built on first use in the process."""
+    if city not in _indexes:
+        data = load_city(city)
+        _indexes[city] = StationIndex(data.graph, data.names)
+    return _indexes[city]
+
+def main(argv=None):
+    from route_table import CITIES
+
+    parser = argparse.ArgumentParser(description="Look up station names.")
+    parser.add_argument('--city', choices=CITIES, default='bengaluru')
+    parser.add_argument('--limit', type=int, default=5)
+    parser.add_argument('query', nargs='+')
+    args = parser.parse_args(argv)
+    start = time.perf_counter()
+    index = station_index(args.city)
+    print(f"index built in {(time.perf_counter() - start) * 1000:.1f} ms")
+    for query in args.query:
+        start = time.perf_counter()
+        found = index.search(query, args.limit)
+        elapsed = (time.perf_counter() - start) * 1e6
+        print(f"{query!r} ({elapsed:.0f} us): " + ", ".join(f"{s} {score:.2f}" for s, score in found))
+
+if __name__ == "__main__":
+    main()
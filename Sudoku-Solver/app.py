@@ -1,7 +1,25 @@
-import re
+import os
+import time
 import streamlit as st
-from board import four_board, six_board, nine_board, eight_board , matrix_to_df
-from solve_sudoku import solve_sudoku, input_valid
+from board import four_board, six_board, nine_board, eight_board
+from compact_board import Board
+from bitmask_solver import SOLVED, GAVE_UP
+from solve_sudoku import solve_sudoku
+from dlx import solve_sudoku_dlx, count_solutions
+from solution_cache import SolutionCache
+from solver_stats import SolverStats, timed
+
+# seconds any engine may search before giving up on a board
+SOLVE_TIME_LIMIT = 5
+# seconds the uniqueness check may take before the answer is left open
+UNIQUENESS_TIME_LIMIT = 2
+
+# None runs the bitmask engine directly on the board's byte buffer
+solvers = {
+    'Constraint propagation': None,
+    'Dancing Links': solve_sudoku_dlx,
+    'Backtracking': solve_sudoku,
+}
 
 st.set_page_config(
     page_title="Sudoku Solver",
@@ -49,27 +67,76 @@ elif (type == '9X9'):
     board = nine_board
     size,n,r,c=350,9,3,3
 
+st.write("### Solver")
+solver = st.selectbox(
+    ' ',
+    tuple(solvers)
+)
+
+show_stats = st.checkbox("Show solver stats (bypasses the solution cache)")
+stats = SolverStats() if show_stats else None
+
 st.write("### Enter the Puzzle below")
 input_data = st.text_area(label="",value=board, height=size)
 
-input = []
+@st.cache_data
+def parse_board(text, n, r, c):
+    return bytes(Board.from_text(text, n, r, c).cells)
 
-for line in input_data.split("\n"):
-    if not "-" in line:
-        vals = re.findall("[0-n]", line.rstrip())
-        val = [int(x) for x in vals]
-        input.append(val)
+try:
+    with timed(stats, 'parse'):
+        puzzle = Board(n, r, c, parse_board(input_data, n, r, c))
+except ValueError:
+    st.write(f"### The puzzle must have {n} rows of {n} numbers")
+    st.stop()
+
+@st.cache_resource
+def solution_cache():
+    return SolutionCache(maxsize=4096, path=os.path.join(os.path.dirname(__file__), "solution_cache.json"))
+
+cache = solution_cache()
 
 if st.button("Solve!"):
     st.header('Solution')
-    msg,check=input_valid(input,n,r,c)
+    with timed(stats, 'validate'):
+        msg,check,conflicts=puzzle.validate()
     if(check):
-        if(solve_sudoku(input,n,r,c)):
-            st.write(matrix_to_df(input,n))
+        cached = None if stats else cache.get(puzzle.cells,n,r,c)
+        if cached:
+            solution, unique = cached
+            puzzle.cells[:] = bytes(solution)
+            solved = True
+        else:
+            with timed(stats, 'uniqueness'):
+                try:
+                    unique = count_solutions(puzzle.to_matrix(),n,r,c,deadline=time.monotonic() + UNIQUENESS_TIME_LIMIT) == 1
+                except TimeoutError:
+                    unique = None
+            given = bytes(puzzle.cells)
+            with timed(stats, 'solve'):
+                status = puzzle.solve_within(SOLVE_TIME_LIMIT, stats=stats, solver=solvers[solver])
+            solved = status == SOLVED
+            if solved:
+                cache.put(given,puzzle.cells,n,r,c,unique)
+                cache.maybe_save()
+        if(solved):
+            with timed(stats, 'render'):
+                st.write(puzzle.to_df())
+            if unique is None: st.write(f"Note: could not check within {UNIQUENESS_TIME_LIMIT} seconds whether this solution is unique")
+            elif not unique: st.write("Note: this puzzle has more than one solution")
+        elif status == GAVE_UP: st.write(f"Gave up after {SOLVE_TIME_LIMIT} seconds without a solution")
         else: st.write("Invalid Sudoku!!")
     else: 
         st.write("""### """, msg)
+        st.write("Conflicting cells (row, column):", ", ".join(f"({i+1}, {j+1})" for i,j in conflicts))
     
 else:
     st.header('Board Layout')
-    st.write(matrix_to_df(input,n))
+    with timed(stats, 'render'):
+        st.write(puzzle.to_df())
+
+if stats:
+    st.write("### Solver stats")
+    st.json(stats.as_dict())
+
+st.caption(f"Solution cache: {cache.hits} hits, {cache.misses} misses")
@@ -0,0 +1,110 @@
+"""Headless batch solver.
+
+Reads one puzzle per line (n*n characters, '0' or '.' for blanks) from a
+file or stdin, solves them across a process pool and writes one line per
+puzzle, in input order: the solution, or the puzzle followed by a tab and
+the same message the Streamlit app would show.
+
+    python batch_solve.py puzzles.txt -o solutions.txt --size 9
+"""
+import argparse
+import json
+import sys
+import time
+from multiprocessing import Pool
+
+from compact_board import Board
+from bitmask_solver import SOLVED, GAVE_UP
+from solver_stats import SolverStats, timed
+from solve_sudoku import solve_sudoku
+from dlx import solve_sudoku_dlx
+
+# same (n, r, c) box shapes app.py uses for each board type
+geometries = {4: (4, 2, 2), 6: (6, 2, 3), 8: (8, 2, 4), 9: (9, 3, 3)}
+
+# None runs the bitmask engine directly on the board's byte buffer
+solvers = {
+    'bitmask': None,
+    'dlx': solve_sudoku_dlx,
+    'backtracking': solve_sudoku,
+}
+
+def _solve_line(line, size, solver, stats, time_limit):
+    n, r, c = geometries[size]
+    puzzle = line.strip()
+    try:
+        with timed(stats, 'parse'):
+            board = Board.from_line(puzzle, n, r, c)
+    except ValueError:
+        return puzzle + "\tMalformed puzzle"
+    with timed(stats, 'validate'):
+        msg, check, _ = board.validate()
+    if not check:
+        return puzzle + "\t" + msg
+    with timed(stats, 'solve'):
+        status = board.solve_within(time_limit, stats=stats, solver=solvers[solver])
+    if status == GAVE_UP:
+        return puzzle + "\tGave up"
+    if status != SOLVED:
+        return puzzle + "\tInvalid Sudoku!!"
+    with timed(stats, 'render'):
+        return board.to_line()
+
+def solve_line(args):
+    """Worker entry: (output line, stats dict or None)."""
+    line, size, solver, with_stats, time_limit = args
+    stats = SolverStats() if with_stats else None
+    out = _solve_line(line, size, solver, stats, time_limit)
+    return out, stats and stats.as_dict()
+
+def solve_stream(lines, size=9, solver='bitmask', processes=None, chunksize=256, stats=False,
+                 time_limit=None):
+    """Yield (output line, stats) per input line, preserving input order.
+
+    A blank line is answered like any other malformed puzzle, so output
+    line k always belongs to input line k.  The pool pulls tasks lazily
+    from the input as its task pipe drains, so arbitrarily large files
+    stream through without being read into memory up front.
+    """
+    tasks = ((line, size, solver, stats, time_limit) for line in lines)
+    with Pool(processes) as pool:
+        yield from pool.imap(solve_line, tasks, chunksize)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Solve a file of Sudoku puzzles, one per line.")
+    parser.add_argument('input', nargs='?', default='-', help="puzzle file, '-' for stdin")
+    parser.add_argument('-o', '--output', default='-', help="solution file, '-' for stdout")
+    parser.add_argument('--size', type=int, choices=sorted(geometries), default=9)
+    parser.add_argument('--solver', choices=sorted(solvers), default='bitmask')
+    parser.add_argument('-j', '--processes', type=int, default=None)
+    parser.add_argument('--chunksize', type=int, default=256)
+    parser.add_argument('--stats', metavar='PATH', help="write per-puzzle solver stats as JSON lines")
+    parser.add_argument('--time-limit', type=float, default=None,
+                        help="seconds any solver may spend per puzzle before giving up")
+    args = parser.parse_args(argv)
+
+    src = sys.stdin if args.input == '-' else open(args.input)
+    dst = sys.stdout if args.output == '-' else open(args.output, 'w')
+    stats_out = open(args.stats, 'w') if args.stats else None
+    start = time.perf_counter()
+    count = 0
+    try:
+        for out, stats in solve_stream(src, args.size, args.solver, args.processes, args.chunksize,
+                                       stats_out is not None, args.time_limit):
+            dst.write(out + "\n")
+            if stats_out is not None:
+                stats_out.write(json.dumps(dict(stats, puzzle=count + 1)) + "\n")
+            count += 1
+    finally:
+        if stats_out is not None:
+            stats_out.close()
+        if src is not sys.stdin:
+            src.close()
+        if dst is not sys.stdout:
+            dst.close()
+    elapsed = time.perf_counter() - start
+    rate = count / elapsed if elapsed else 0.0
+    print(f"{count} puzzles in {elapsed:.2f}s ({rate:.0f} puzzles/sec)", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""Vectorized validation of many boards at once.
+
+    python batch_validate.py solutions.txt --size 9
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from solve_sudoku import conflict_message
+from batch_solve import geometries
+
+# code bit 1: row clash, 2: column clash, 4: box clash, 8: a number above n
+# (0 means valid)
+ROW, COL, BOX, RANGE = 1, 2, 4, 8
+messages = [conflict_message(not code & ROW, not code & COL, not code & BOX) for code in range(8)]
+messages += ["Numbers out of range"] * 8
+
+def _dup(units):
+    """(N, n, n) units along the last axis -> (N, n) bool, any repeated non-zero."""
+    s = np.sort(units, axis=-1)
+    return ((s[..., 1:] == s[..., :-1]) & (s[..., 1:] != 0)).any(axis=-1)
+
+def boxes_view(boards, r, c):
+    """Rearrange (N, n, n) boards so that each row of the result is one box."""
+    N, n, _ = boards.shape
+    return (boards.reshape(N, n // r, r, n // c, c)
+                  .transpose(0, 1, 3, 2, 4)
+                  .reshape(N, n, n))
+
+def validate_batch(boards, r, c, chunk=65536):
+    """Check every row, column and box of a stack of boards.
+
+    boards is an (N, n, n) integer array with 0 for blanks.  Returns a
+    bool validity mask and a uint8 conflict code per board; the code is the
+    row/column/box combination isValid reports for the first offending cell
+    (row-major), so messages[code] matches the app's message, or RANGE for a
+    board holding a number above n.
+    """
+    boards = np.asarray(boards, dtype=np.uint8)
+    N, n, _ = boards.shape
+    codes = np.zeros(N, dtype=np.uint8)
+    box_of = (np.arange(n)[:, None] // r) * (n // c) + np.arange(n)[None, :] // c
+    for lo in range(0, N, chunk):
+        part = boards[lo:lo + chunk]
+        row_bad = _dup(part)
+        col_bad = _dup(part.transpose(0, 2, 1))
+        box_bad = _dup(boxes_view(part, r, c))
+        cell = (row_bad[:, :, None] * ROW
+                | col_bad[:, None, :] * COL
+                | box_bad[:, box_of] * BOX).reshape(len(part), n * n)
+        first = (cell != 0).argmax(axis=1)
+        codes[lo:lo + chunk] = np.where((part > n).any(axis=(1, 2)), RANGE,
+                                        cell[np.arange(len(part)), first])
+    return codes == 0, codes
+
+def solved_batch(boards, r, c):
+    """Validity mask restricted to fully filled boards."""
+    boards = np.asarray(boards, dtype=np.uint8)
+    valid, codes = validate_batch(boards, r, c)
+    return valid & (boards != 0).all(axis=(1, 2)), codes
+
+def load_boards(lines, n):
+    """Stack lines of n*n characters ('0' or '.' for blanks) into (N, n, n).
+
+    Returns (boards, line numbers of the boards, bad lines), where bad lines
+    lists (line number, message) for every non-blank line that is not a
+    board; blank lines are skipped.
+    """
+    others = str.maketrans("", "", "." + "".join(str(d) for d in range(n + 1)))
+    good, numbers, bad = [], [], []
+    for k, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+        if len(line) != n * n or line.translate(others):
+            bad.append((k, f"Expected {n * n} characters from 0-{n} and '.'"))
+            continue
+        good.append(line)
+        numbers.append(k)
+    raw = "".join(good).replace(".", "0")
+    flat = np.frombuffer(raw.encode(), dtype=np.uint8) - ord("0")
+    return flat.reshape(-1, n, n), np.array(numbers, dtype=np.int64), bad
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Validate a file of boards, one per line.")
+    parser.add_argument('input', nargs='?', default='-', help="board file, '-' for stdin")
+    parser.add_argument('--size', type=int, choices=sorted(geometries), default=9)
+    parser.add_argument('--solved', action='store_true', help="also require every cell filled")
+    args = parser.parse_args(argv)
+
+    n, r, c = geometries[args.size]
+    src = sys.stdin if args.input == '-' else open(args.input)
+    with src:
+        boards, numbers, bad = load_boards(src, n)
+    start = time.perf_counter()
+    valid, codes = (solved_batch if args.solved else validate_batch)(boards, r, c)
+    elapsed = time.perf_counter() - start
+    report = [(numbers[k], messages[codes[k]] or 'Incomplete board') for k in np.flatnonzero(~valid)]
+    for line, message in sorted(report + bad):
+        print(f"{line}\t{message}")
+    rate = len(boards) / elapsed if elapsed else 0.0
+    print(f"{int(valid.sum())}/{len(boards) + len(bad)} valid in {elapsed:.2f}s ({rate:.0f} boards/sec)", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
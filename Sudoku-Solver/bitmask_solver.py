@@ -0,0 +1,204 @@
+import time
+
+SOLVED, UNSOLVABLE, GAVE_UP = 'solved', 'unsolvable', 'gave up'
+
+_geometries = {}
+
+def geometry(n, r, c):
+    """Precomputed lookup tables for an n x n board with r x c boxes."""
+    key = (n, r, c)
+    if key not in _geometries:
+        cell_row, cell_col, cell_box = [], [], []
+        for i in range(n):
+            for j in range(n):
+                cell_row.append(i)
+                cell_col.append(j)
+                cell_box.append((i // r) * (n // c) + j // c)
+        units = [[i * n + j for j in range(n)] for i in range(n)]
+        units += [[i * n + j for i in range(n)] for j in range(n)]
+        units += [[k for k in range(n * n) if cell_box[k] == b] for b in range(n)]
+        _geometries[key] = (n, (1 << n) - 1, cell_row, cell_col, cell_box, units)
+    return _geometries[key]
+
+def _place(cells, rows, cols, boxes, geo, i, bit):
+    cells[i] = bit.bit_length()
+    rows[geo[2][i]] |= bit
+    cols[geo[3][i]] |= bit
+    boxes[geo[4][i]] |= bit
+
+def _propagate(cells, rows, cols, boxes, geo, stats):
+    """Fill naked and hidden singles; return the candidate masks or None."""
+    n, full, cell_row, cell_col, cell_box, units = geo
+    empties = [i for i in range(n * n) if not cells[i]]
+    while True:
+        if stats is not None:
+            stats.candidate_checks += len(empties)
+        cands = [0] * (n * n)
+        changed = False
+        # naked singles: a cell with exactly one candidate left
+        for i in empties:
+            cand = full & ~(rows[cell_row[i]] | cols[cell_col[i]] | boxes[cell_box[i]])
+            if not cand:
+                return None
+            if cand & (cand - 1):
+                cands[i] = cand
+            else:
+                _place(cells, rows, cols, boxes, geo, i, cand)
+                changed = True
+        if changed:
+            empties = [i for i in empties if not cells[i]]
+            continue
+        # hidden singles: a digit with exactly one home left in a unit
+        for unit in units:
+            once = more = placed = 0
+            for i in unit:
+                cand = cands[i]
+                if cand:
+                    more |= once & cand
+                    once |= cand
+                else:
+                    placed |= 1 << (cells[i] - 1)
+            if once | placed != full:
+                return None
+            singles = once & ~more
+            while singles:
+                bit = singles & -singles
+                singles ^= bit
+                # candidates only shrink, so a single that went stale during
+                # this pass is either already placed in the unit or a dead end
+                digit = bit.bit_length()
+                for i in unit:
+                    if cands[i] & bit:
+                        break
+                if cells[i] == digit or any(cells[k] == digit for k in unit):
+                    continue
+                if cells[i] or (rows[cell_row[i]] | cols[cell_col[i]] | boxes[cell_box[i]]) & bit:
+                    return None
+                _place(cells, rows, cols, boxes, geo, i, bit)
+                changed = True
+        if not changed:
+            return cands
+        empties = [i for i in empties if not cells[i]]
+
+def _search(cells, rows, cols, boxes, geo, stats=None, deadline=None, max_nodes=None, limit=1):
+    """Depth-first search with an explicit stack instead of recursion.
+
+    Each stack frame holds a propagated state, the branching cell and the
+    candidates not tried yet.  deadline (a time.monotonic() value) and
+    max_nodes bound the search, which stops after limit solutions;
+    returns (status, solutions).
+    """
+    found = []
+    stack = []
+    state, depth, nodes = (cells, rows, cols, boxes), 0, 0
+    while True:
+        if state is not None:
+            nodes += 1
+            if stats is not None:
+                stats.enter(depth)
+            if ((max_nodes is not None and nodes > max_nodes)
+                    or (deadline is not None and time.monotonic() > deadline)):
+                return GAVE_UP, found
+            cands = _propagate(*state, geo, stats)
+            if cands is None:
+                if stats is not None:
+                    stats.backtracks += 1
+            else:
+                best, best_cand, best_count = -1, 0, geo[0] + 1
+                for i, cand in enumerate(cands):
+                    if cand:
+                        count = bin(cand).count("1")
+                        if count < best_count:
+                            best, best_cand, best_count = i, cand, count
+                            if count == 2:
+                                break
+                if best < 0:
+                    found.append(state[0])
+                    if len(found) >= limit:
+                        return SOLVED, found
+                else:
+                    stack.append((state, best, best_cand, depth))
+            state = None
+        while stack:
+            parent, best, rest, d = stack[-1]
+            if rest:
+                bit = rest & -rest
+                stack[-1] = (parent, best, rest ^ bit, d)
+                state = tuple(part[:] for part in parent)
+                _place(*state, geo, best, bit)
+                depth = d + 1
+                break
+            stack.pop()
+        if state is None:
+            return (SOLVED if found else UNSOLVABLE), found
+
+def load_masks(cells, geo):
+    """Build row/column/box digit masks, or None if two givens clash."""
+    n, full, cell_row, cell_col, cell_box, units = geo
+    rows, cols, boxes = [0] * n, [0] * n, [0] * n
+    for i, v in enumerate(cells):
+        if v:
+            bit = 1 << (v - 1)
+            if (rows[cell_row[i]] | cols[cell_col[i]] | boxes[cell_box[i]]) & bit:
+                return None
+            rows[cell_row[i]] |= bit
+            cols[cell_col[i]] |= bit
+            boxes[cell_box[i]] |= bit
+    return rows, cols, boxes
+
+def search_cells(cells, n, r, c, stats=None, time_limit=None, max_nodes=None):
+    """Solve a flat cell buffer within an optional time (seconds) or node budget.
+
+    Returns (status, cells) where status is SOLVED, UNSOLVABLE or GAVE_UP
+    and cells is the filled buffer when solved.  The input is not modified.
+    """
+    geo = geometry(n, r, c)
+    masks = load_masks(cells, geo)
+    if masks is None:
+        return UNSOLVABLE, None
+    deadline = None if time_limit is None else time.monotonic() + time_limit
+    status, found = _search(cells[:], *masks, geo, stats, deadline, max_nodes)
+    return status, (found[0] if status == SOLVED else None)
+
+def fill_singles(cells, n, r, c):
+    """Apply naked and hidden singles to a flat buffer in place.
+
+    Returns False if the board runs into a contradiction.
+    """
+    geo = geometry(n, r, c)
+    masks = load_masks(cells, geo)
+    return masks is not None and _propagate(cells, *masks, geo, None) is not None
+
+def count_cells(cells, n, r, c, limit=2, max_nodes=None):
+    """Count solutions of a flat cell buffer, stopping at limit.
+
+    Returns None if max_nodes runs out before the count is settled.
+    """
+    geo = geometry(n, r, c)
+    masks = load_masks(cells, geo)
+    if masks is None:
+        return 0
+    status, found = _search(cells[:], *masks, geo, max_nodes=max_nodes, limit=limit)
+    return None if status == GAVE_UP else len(found)
+
+def solve_cells(cells, n, r, c, stats=None):
+    """Solve a flat row-major cell buffer (list or bytearray).
+
+    Returns a filled buffer of the same type, or None if there is no
+    solution.  The input buffer is not modified.
+    """
+    return search_cells(cells, n, r, c, stats)[1]
+
+def solve_sudoku_bitmask(board, n, r, c, stats=None):
+    """Drop-in replacement for solve_sudoku using candidate bitmasks.
+
+    Keeps a digit mask per row, column and box, fills naked and hidden
+    singles, and branches on the cell with the fewest candidates (MRV).
+    Like solve_sudoku, the board is filled in place and a bool returned.
+    """
+    solved = solve_cells([v for row in board for v in row], n, r, c, stats)
+    if solved is None:
+        return False
+    for i in range(n):
+        board[i][:] = solved[i * n:(i + 1) * n]
+    return True
@@ -0,0 +1,135 @@
+import time
+import numpy as np
+from bitmask_solver import geometry, solve_cells, search_cells, SOLVED, UNSOLVABLE, GAVE_UP
+from solve_sudoku import validate_cells
+
+_peers = {}
+
+def peer_table(n, r, c):
+    """For every cell index, the sorted indices sharing its row, column or box."""
+    key = (n, r, c)
+    if key not in _peers:
+        units = geometry(n, r, c)[5]
+        peers = [set() for _ in range(n * n)]
+        for unit in units:
+            for i in unit:
+                peers[i].update(unit)
+        _peers[key] = tuple(tuple(sorted(p - {i})) for i, p in enumerate(peers))
+    return _peers[key]
+
+class Board:
+    """A Sudoku board stored as one byte per cell, row-major.
+
+    A 9x9 board is an 81-byte bytearray instead of nine lists of Python
+    ints, and the solver and validator work on the buffer directly.
+    """
+    __slots__ = ('n', 'r', 'c', 'cells')
+
+    def __init__(self, n, r, c, cells=None):
+        self.n, self.r, self.c = n, r, c
+        self.cells = bytearray(n * n) if cells is None else bytearray(cells)
+        if len(self.cells) != n * n:
+            raise ValueError(f"expected {n * n} cells, got {len(self.cells)}")
+
+    @classmethod
+    def from_text(cls, text, n, r, c):
+        """Parse the boxed layout used by the templates in board.py."""
+        digits = set(str(d) for d in range(min(n, 9) + 1))
+        cells = bytearray()
+        for line in text.split("\n"):
+            if "-" not in line:
+                cells.extend(ord(ch) - 48 for ch in line if ch in digits)
+        return cls(n, r, c, cells)
+
+    @classmethod
+    def from_line(cls, line, n, r, c):
+        """Parse a single line of n*n characters, '0' or '.' for blanks."""
+        line = line.strip()
+        cells = bytearray(0 if ch == '.' else ord(ch) - 48 for ch in line)
+        if any(v > n for v in cells):
+            raise ValueError("digit out of range")
+        return cls(n, r, c, cells)
+
+    @classmethod
+    def from_matrix(cls, matrix, n, r, c):
+        return cls(n, r, c, [v for row in matrix for v in row])
+
+    def to_text(self):
+        n, r, c = self.n, self.r, self.c
+        rows = []
+        for i in range(n):
+            line = "|"
+            for j in range(n):
+                line += "  " + str(self.cells[i * n + j])
+                if (j + 1) % c == 0:
+                    line += "  |"
+            rows.append(line)
+        sep = "-" * (len(rows[0]) - 2)
+        out = [sep]
+        for i, line in enumerate(rows):
+            out.append(line)
+            if (i + 1) % r == 0:
+                out.append(sep)
+        return "\n".join(out)
+
+    def to_line(self):
+        return self.cells.translate(_digits).decode()
+
+    def to_matrix(self):
+        n = self.n
+        return [list(self.cells[i * n:(i + 1) * n]) for i in range(n)]
+
+    def as_array(self):
+        """A zero-copy (n, n) uint8 view of the cells."""
+        return np.frombuffer(self.cells, dtype=np.uint8).reshape(self.n, self.n)
+
+    def to_df(self):
+        from board import matrix_to_df
+        return matrix_to_df(self.as_array(), self.n)
+
+    def peers(self, i):
+        return peer_table(self.n, self.r, self.c)[i]
+
+    def validate(self):
+        """Same (msg, ok, conflicts) triple as solve_sudoku.validate."""
+        return validate_cells(self.cells, self.n, self.r, self.c)
+
+    def solve(self, solver=None, stats=None):
+        """Fill the board in place; solver is an optional (board, n, r, c) function."""
+        if solver is None:
+            solved = solve_cells(self.cells, self.n, self.r, self.c, stats)
+            if solved is None:
+                return False
+            self.cells[:] = solved
+            return True
+        matrix = self.to_matrix()
+        if not solver(matrix, self.n, self.r, self.c, stats=stats):
+            return False
+        self.cells[:] = bytes(v for row in matrix for v in row)
+        return True
+
+    def solve_within(self, time_limit=None, max_nodes=None, stats=None, solver=None):
+        """Solve under a time (seconds) or node budget.
+
+        Without a solver this is the bitmask search, bounded by either budget;
+        a solver function that takes a deadline (solve_sudoku,
+        solve_sudoku_dlx) is bounded by time_limit only.  Returns the
+        bitmask_solver status; the board is filled only when it is SOLVED,
+        and stats keeps the partial counts when the search gives up.
+        """
+        if solver is not None:
+            matrix = self.to_matrix()
+            deadline = None if time_limit is None else time.monotonic() + time_limit
+            try:
+                if not solver(matrix, self.n, self.r, self.c, stats=stats, deadline=deadline):
+                    return UNSOLVABLE
+            except TimeoutError:
+                return GAVE_UP
+            self.cells[:] = bytes(v for row in matrix for v in row)
+            return SOLVED
+        status, solved = search_cells(self.cells, self.n, self.r, self.c, stats, time_limit, max_nodes)
+        if status == SOLVED:
+            self.cells[:] = solved
+        return status
+
+_digits = bytes.maketrans(bytes(range(10)), b'0123456789')
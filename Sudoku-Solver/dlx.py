@@ -0,0 +1,178 @@
+import time
+
+class DancingLinks:
+    """Knuth's Algorithm X over a sparse exact-cover matrix.
+
+    Nodes live in flat integer arrays (left, right, up, down, column) so
+    the cover/uncover steps are plain list writes.  Node 0 is the root and
+    nodes 1..columns are the column headers.
+    """
+
+    def __init__(self, columns):
+        self.columns = columns
+        self.left = [(i - 1) % (columns + 1) for i in range(columns + 1)]
+        self.right = [(i + 1) % (columns + 1) for i in range(columns + 1)]
+        self.up = list(range(columns + 1))
+        self.down = list(range(columns + 1))
+        self.col = list(range(columns + 1))
+        self.size = [0] * (columns + 1)
+        self.row_of = [-1] * (columns + 1)
+        self.row_start = {}
+
+    def add_row(self, row_id, cols):
+        first = None
+        for c in cols:
+            node = len(self.col)
+            self.col.append(c + 1)
+            self.row_of.append(row_id)
+            self.up.append(self.up[c + 1])
+            self.down.append(c + 1)
+            self.down[self.up[c + 1]] = node
+            self.up[c + 1] = node
+            self.size[c + 1] += 1
+            if first is None:
+                first = self.row_start[row_id] = node
+                self.left.append(node)
+                self.right.append(node)
+            else:
+                self.left.append(self.left[first])
+                self.right.append(first)
+                self.right[self.left[first]] = node
+                self.left[first] = node
+
+    def cover(self, c):
+        left, right, up, down, col, size = self.left, self.right, self.up, self.down, self.col, self.size
+        right[left[c]] = right[c]
+        left[right[c]] = left[c]
+        i = down[c]
+        while i != c:
+            j = right[i]
+            while j != i:
+                down[up[j]] = down[j]
+                up[down[j]] = up[j]
+                size[col[j]] -= 1
+                j = right[j]
+            i = down[i]
+
+    def uncover(self, c):
+        left, right, up, down, col, size = self.left, self.right, self.up, self.down, self.col, self.size
+        i = up[c]
+        while i != c:
+            j = left[i]
+            while j != i:
+                size[col[j]] += 1
+                down[up[j]] = j
+                up[down[j]] = j
+                j = left[j]
+            i = up[i]
+        right[left[c]] = c
+        left[right[c]] = c
+
+    def select(self, row_id):
+        """Force a row into the solution (used for the givens)."""
+        node = self.row_start[row_id]
+        j = node
+        while True:
+            c = self.col[j]
+            if self.left[self.right[c]] != c:
+                return False
+            self.cover(c)
+            j = self.right[j]
+            if j == node:
+                return True
+
+    def search(self, limit=1, stats=None, deadline=None):
+        """Yield up to limit solutions, each a list of row ids.
+
+        Raises TimeoutError once time.monotonic() passes deadline.
+        """
+        right, down, col, size, row_of = self.right, self.down, self.col, self.size, self.row_of
+        partial = []
+
+        def recurse():
+            if deadline is not None and time.monotonic() > deadline:
+                raise TimeoutError
+            if stats is not None:
+                stats.enter(len(partial))
+            if right[0] == 0:
+                yield list(partial)
+                return
+            c, best = 0, None
+            j = right[0]
+            while j != 0:
+                if best is None or size[j] < best:
+                    c, best = j, size[j]
+                    if best < 2:
+                        break
+                j = right[j]
+            if best == 0:
+                return
+            self.cover(c)
+            i = down[c]
+            while i != c:
+                if stats is not None:
+                    stats.candidate_checks += 1
+                partial.append(row_of[i])
+                j = right[i]
+                while j != i:
+                    self.cover(col[j])
+                    j = right[j]
+                yield from recurse()
+                j = self.left[i]
+                while j != i:
+                    self.uncover(col[j])
+                    j = self.left[j]
+                partial.pop()
+                if stats is not None:
+                    stats.backtracks += 1
+                i = down[i]
+            self.uncover(c)
+
+        found = 0
+        for solution in recurse():
+            yield solution
+            found += 1
+            if found >= limit:
+                return
+
+def sudoku_matrix(board, n, r, c):
+    """Build the exact-cover matrix for a board with r x c boxes.
+
+    Columns are cell, row-digit, column-digit and box-digit constraints;
+    matrix row (i * n + j) * n + d places digit d + 1 at (i, j).  Returns
+    None if the givens already clash.
+    """
+    dl = DancingLinks(4 * n * n)
+    for i in range(n):
+        for j in range(n):
+            b = (i // r) * (n // c) + j // c
+            for d in range(n):
+                dl.add_row((i * n + j) * n + d,
+                           (i * n + j, n * n + i * n + d, 2 * n * n + j * n + d, 3 * n * n + b * n + d))
+    for i in range(n):
+        for j in range(n):
+            if board[i][j] and not dl.select((i * n + j) * n + board[i][j] - 1):
+                return None
+    return dl
+
+def solve_sudoku_dlx(board, n, r, c, stats=None, deadline=None):
+    """Solve in place with Dancing Links; same call as solve_sudoku."""
+    dl = sudoku_matrix(board, n, r, c)
+    if dl is None:
+        return False
+    for solution in dl.search(stats=stats, deadline=deadline):
+        for row_id in solution:
+            cell, d = divmod(row_id, n)
+            board[cell // n][cell % n] = d + 1
+        return True
+    return False
+
+def count_solutions(board, n, r, c, limit=2, deadline=None):
+    """Count solutions of the board, stopping once limit is reached.
+
+    Raises TimeoutError once time.monotonic() passes deadline.
+    """
+    dl = sudoku_matrix(board, n, r, c)
+    if dl is None:
+        return 0
+    return sum(1 for _ in dl.search(limit, deadline=deadline))
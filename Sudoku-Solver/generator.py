@@ -0,0 +1,144 @@
+"""Puzzle generator with a uniqueness guarantee and difficulty grades.
+
+    python generator.py --size 9 --count 1000 -o pool.txt
+
+Each output line is the puzzle, its solution and its grade separated by
+tabs, in the same one-line form batch_solve.py reads.
+"""
+import argparse
+import math
+import random
+import sys
+import time
+from multiprocessing import Pool
+
+from batch_solve import geometries
+from bitmask_solver import geometry, load_masks, count_cells, search_cells, fill_singles
+from compact_board import Board
+
+GRADES = ('easy', 'medium', 'hard')
+
+# node budget for one uniqueness check; a check that runs out keeps the clue
+UNIQUENESS_NODES = 2000
+
+def random_solution(n, r, c, rng):
+    """A random complete grid: scatter a few random legal digits, then solve."""
+    geo = geometry(n, r, c)
+    while True:
+        cells = [0] * (n * n)
+        for i in rng.sample(range(n * n), n):
+            rows, cols, boxes = load_masks(cells, geo)
+            free = [d for d in range(1, n + 1)
+                    if not (rows[geo[2][i]] | cols[geo[3][i]] | boxes[geo[4][i]]) & (1 << (d - 1))]
+            if free:
+                cells[i] = rng.choice(free)
+        status, solved = search_cells(cells, n, r, c, max_nodes=UNIQUENESS_NODES)
+        if solved is not None:
+            return list(solved)
+
+def _naked_singles(cells, geo):
+    """Fill naked singles only; True if that solves the board."""
+    n, full, cell_row, cell_col, cell_box, units = geo
+    rows, cols, boxes = load_masks(cells, geo)
+    changed = True
+    while changed:
+        changed = False
+        for i in range(n * n):
+            if cells[i] == 0:
+                cand = full & ~(rows[cell_row[i]] | cols[cell_col[i]] | boxes[cell_box[i]])
+                if cand and not cand & (cand - 1):
+                    cells[i] = cand.bit_length()
+                    rows[cell_row[i]] |= cand
+                    cols[cell_col[i]] |= cand
+                    boxes[cell_box[i]] |= cand
+                    changed = True
+    return all(cells)
+
+def grade(cells, n, r, c):
+    """Grade a uniquely solvable puzzle by the techniques it needs.
+
+    'easy' falls to naked singles alone, 'medium' also needs hidden
+    singles, and 'hard' needs search beyond single-candidate propagation.
+    """
+    if _naked_singles(list(cells), geometry(n, r, c)):
+        return 'easy'
+    work = list(cells)
+    if fill_singles(work, n, r, c) and all(work):
+        return 'medium'
+    return 'hard'
+
+def make_puzzle(solution, n, r, c, rng):
+    """Remove clues from a solved grid while the solution stays unique.
+
+    Each check stops at the second solution (count_cells with limit=2).
+    """
+    cells = list(solution)
+    for i in rng.sample(range(n * n), n * n):
+        value, cells[i] = cells[i], 0
+        if count_cells(cells, n, r, c, limit=2, max_nodes=UNIQUENESS_NODES) != 1:
+            cells[i] = value
+    return cells
+
+def generate(size, seed=None):
+    """One (puzzle, solution, grade) for a board size from batch_solve.geometries."""
+    n, r, c = geometries[size]
+    rng = random.Random(seed)
+    solution = random_solution(n, r, c, rng)
+    puzzle = make_puzzle(solution, n, r, c, rng)
+    return puzzle, solution, grade(puzzle, n, r, c)
+
+def _generate_line(args):
+    size, seed = args
+    n, r, c = geometries[size]
+    puzzle, solution, level = generate(size, seed)
+    return (Board(n, r, c, puzzle).to_line(), Board(n, r, c, solution).to_line(), level)
+
+def generate_pool(size, count, processes=None, seed=None, grades=GRADES):
+    """Yield count generated puzzles with a grade in grades, across a process pool.
+
+    Each batch queues as many seeds as the acceptance rate seen so far says
+    are still needed, and the pool is stopped as soon as count are made.
+    Results come back in seed order, so a seeded run is reproducible.
+    """
+    base = random.Random(seed).getrandbits(32)
+    made = tried = 0
+    with Pool(processes) as pool:
+        while made < count:
+            if made:
+                wanted = math.ceil((count - made) * tried / made)
+            else:
+                wanted = max(count, 2 * tried)
+            batch = [(size, base + tried + k) for k in range(wanted)]
+            tried += len(batch)
+            for result in pool.imap(_generate_line, batch):
+                if result[2] in grades:
+                    made += 1
+                    yield result
+                    if made == count:
+                        break
+        # leaving the with block terminates whatever is still queued
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate uniquely solvable, graded puzzles.")
+    parser.add_argument('--size', type=int, choices=sorted(geometries), default=9)
+    parser.add_argument('--count', type=int, default=100)
+    parser.add_argument('--grade', choices=GRADES, action='append',
+                        help="only keep these grades (repeatable)")
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('-j', '--processes', type=int, default=None)
+    parser.add_argument('-o', '--output', default='-', help="pool file, '-' for stdout")
+    args = parser.parse_args(argv)
+
+    dst = sys.stdout if args.output == '-' else open(args.output, 'w')
+    start = time.perf_counter()
+    try:
+        for line in generate_pool(args.size, args.count, args.processes, args.seed, args.grade or GRADES):
+            dst.write("\t".join(line) + "\n")
+    finally:
+        if dst is not sys.stdout:
+            dst.close()
+    elapsed = time.perf_counter() - start
+    print(f"{args.count} puzzles in {elapsed:.2f}s ({args.count / elapsed:.1f} puzzles/sec)", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+import atexit
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import Counter, OrderedDict
+from itertools import permutations, product
+
+# give up on canonicalising boards whose symmetry search would exceed this
+# many row/column orderings (nearly blank boards); they are just not cached
+MAX_CANDIDATES = 4096
+# maybe_save writes once this many entries are new, or once new entries are
+# this many seconds old
+SAVE_EVERY = 32
+SAVE_INTERVAL = 60
+
+def _tied_orders(items, key):
+    """Every ordering of items sorted by key, permuting runs of equal keys."""
+    items = sorted(items, key=key)
+    runs, run = [], [items[0]]
+    for item in items[1:]:
+        if key(item) == key(run[0]):
+            run.append(item)
+        else:
+            runs.append(run)
+            run = [item]
+    runs.append(run)
+    return [sum(choice, ()) for choice in product(*(list(permutations(run)) for run in runs))]
+
+def _axis_orders(keys, n, block):
+    """Orderings of lines 0..n-1 that keep blocks of `block` lines together.
+
+    Blocks (bands or stacks) are sorted by the multiset of their line keys
+    and lines by their own key; only ties are enumerated.
+    """
+    blocks = [tuple(range(b * block, (b + 1) * block)) for b in range(n // block)]
+    block_key = [tuple(sorted(keys[i] for i in blk)) for blk in blocks]
+    block_orders = _tied_orders(range(len(blocks)), block_key.__getitem__)
+    within = [_tied_orders(blk, keys.__getitem__) for blk in blocks]
+    count = len(block_orders)
+    for w in within:
+        count *= len(w)
+    if count > MAX_CANDIDATES:
+        return None
+    return [sum(choice, ()) for order in block_orders for choice in product(*(within[b] for b in order))]
+
+def _line_keys(g, n, r, c):
+    """Row and column invariants under relabeling and band/stack shuffles."""
+    freq = Counter(v for v in g if v)
+    rows = [[g[i * n + j] for j in range(n)] for i in range(n)]
+    cols = [[g[i * n + j] for i in range(n)] for j in range(n)]
+
+    def base(lines, group):
+        return [(sum(1 for v in line if v),
+                 tuple(sorted(sum(1 for v in line[s:s + group] if v) for s in range(0, n, group))))
+                for line in lines]
+
+    row0, col0 = base(rows, c), base(cols, r)
+
+    def refine(lines, own, other, group):
+        return [(own[k], tuple(sorted(tuple(sorted((other[x], freq[line[x]]) for x in range(s, s + group) if line[x]))
+                                      for s in range(0, n, group))))
+                for k, line in enumerate(lines)]
+
+    return refine(rows, row0, col0, c), refine(cols, col0, row0, r)
+
+def canonical_form(cells, n, r, c):
+    """Canonical bytes for a flat board and the transform that produced them.
+
+    The form is the lexicographically smallest relabeled board over the
+    band/row and stack/column shuffles (and transposition for square
+    boxes) that survive the invariant-key sort.  Returns None if too many
+    orderings tie.
+    """
+    best = None
+    options = [(False, list(cells))]
+    if r == c:
+        options.append((True, [cells[j * n + i] for i in range(n) for j in range(n)]))
+    for transposed, g in options:
+        row_keys, col_keys = _line_keys(g, n, r, c)
+        row_orders = _axis_orders(row_keys, n, r)
+        col_orders = _axis_orders(col_keys, n, c)
+        if row_orders is None or col_orders is None or len(row_orders) * len(col_orders) > MAX_CANDIDATES:
+            return None
+        for rows in row_orders:
+            for cols in col_orders:
+                relabel, out = {0: 0}, bytearray(n * n)
+                k = 0
+                for i in rows:
+                    base = i * n
+                    for j in cols:
+                        v = g[base + j]
+                        if v not in relabel:
+                            relabel[v] = len(relabel)
+                        out[k] = relabel[v]
+                        k += 1
+                if best is None or out < best[0]:
+                    best = (out, (transposed, rows, cols, relabel))
+    return bytes(best[0]), best[1]
+
+def _apply(cells, n, transform):
+    """Map a board in the user's orientation into canonical orientation."""
+    transposed, rows, cols, relabel = transform
+    g = [cells[j * n + i] for i in range(n) for j in range(n)] if transposed else cells
+    relabel = dict(relabel)
+    for v in g:
+        if v not in relabel:
+            relabel[v] = len(relabel)
+    return bytes(relabel[g[i * n + j]] for i in rows for j in cols)
+
+def _invert(canon, n, transform):
+    """Map a canonical board back into the user's orientation and labels."""
+    transposed, rows, cols, relabel = transform
+    back = {v: k for k, v in relabel.items()}
+    spare = iter(sorted(set(range(1, n + 1)) - set(back.values())))
+    for v in range(1, n + 1):
+        if v not in back:
+            back[v] = next(spare)
+    g = [0] * (n * n)
+    k = 0
+    for i in rows:
+        for j in cols:
+            g[i * n + j] = back[canon[k]]
+            k += 1
+    if transposed:
+        g = [g[j * n + i] for i in range(n) for j in range(n)]
+    return g
+
+class SolutionCache:
+    """Bounded LRU of solved puzzles keyed by canonical board form.
+
+    Boards that differ only by digit relabeling or a symmetry of their box
+    geometry share one entry.  Pass path to persist entries as JSON; the
+    file is written by save(), by maybe_save() once enough is new, and at
+    exit.
+    """
+
+    def __init__(self, maxsize=1024, path=None):
+        self.maxsize = maxsize
+        self.path = path
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self.save_lock = threading.Lock()
+        self.dirty = 0
+        # time.monotonic() when the oldest unsaved entry was put
+        self.first_unsaved = None
+        if path and os.path.exists(path):
+            self.load()
+        if path:
+            atexit.register(self.save)
+
+    def get(self, cells, n, r, c):
+        """(solved flat cells, unique) for the board, or None on a miss."""
+        form = canonical_form(cells, n, r, c)
+        key = None if form is None else (n, r, c, form[0])
+        with self.lock:
+            if key not in self.entries:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            solution, unique = self.entries[key]
+            return _invert(solution, n, form[1]), unique
+
+    def put(self, cells, solution, n, r, c, unique=True):
+        form = canonical_form(cells, n, r, c)
+        if form is None:
+            return
+        with self.lock:
+            self.entries[(n, r, c, form[0])] = (_apply(solution, n, form[1]), unique)
+            self.entries.move_to_end((n, r, c, form[0]))
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+            if not self.dirty:
+                self.first_unsaved = time.monotonic()
+            self.dirty += 1
+
+    def maybe_save(self):
+        """save() if SAVE_EVERY entries are new or the oldest unsaved one is
+        SAVE_INTERVAL seconds old."""
+        with self.lock:
+            due = self.dirty >= SAVE_EVERY or (self.dirty and time.monotonic() - self.first_unsaved > SAVE_INTERVAL)
+        if due:
+            self.save()
+
+    def save(self):
+        # one writer at a time, each through its own temporary file
+        with self.save_lock:
+            with self.lock:
+                if not self.dirty and os.path.exists(self.path):
+                    return
+                data = [[n, r, c, key.hex(), value.hex(), unique]
+                        for (n, r, c, key), (value, unique) in self.entries.items()]
+                self.dirty = 0
+                self.first_unsaved = None
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.path)), suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w") as f:
+                    json.dump(data, f)
+                os.replace(tmp, self.path)
+            except BaseException:
+                os.unlink(tmp)
+                raise
+
+    def load(self):
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+            entries = [((n, r, c, bytes.fromhex(key)), (bytes.fromhex(value), unique))
+                       for n, r, c, key, value, unique in data[-self.maxsize:]]
+        except (OSError, ValueError, TypeError):
+            return
+        with self.lock:
+            self.entries.update(entries)
@@ -1,3 +1,5 @@
+import time
+
 def find_empty(board,n):
     for i in range(n):
         for j in range(n):
@@ -48,8 +50,7 @@ def box_check(matrix, startRow, startCol, r, c):
 				st.add(curr)
 	return True
 
-def isValid(matrix, row, col, n, r, c):
-    a,b,c=row_check(matrix, row, n),col_check(matrix, col, n),box_check(matrix, row - row % r, col - col % c, r, c)
+def conflict_message(a, b, c):
     if(not a and b and c): msg = "Identical numbers in row"
     elif(a and not b and c): msg = "Identical numbers in column"
     elif(a and b and not c): msg = "Identical numbers in box"
@@ -58,24 +59,66 @@ def isValid(matrix, row, col, n, r, c):
     elif(a and not b and not c): msg = "Identical numbers in column and box"
     elif(not a and not b and not c): msg = "Identical numbers in row, column and box"
     else: msg = ""
-    return (msg,(a and b and c))
+    return msg
+
+def isValid(matrix, row, col, n, r, c):
+    a,b,c=row_check(matrix, row, n),col_check(matrix, col, n),box_check(matrix, row - row % r, col - col % c, r, c)
+    return (conflict_message(a, b, c),(a and b and c))
+
+def validate_cells(cells, n, r, c):
+    """Check every row, column and box in a single sweep of the board.
+
+    cells is the board flattened row-major (a list, bytearray or
+    compact_board.Board buffer).  Returns (msg, ok, conflicts): msg is what
+    isValid reports for the first offending cell, and conflicts lists every
+    (row, col) whose number is repeated in its row, column or box.
+    """
+    row_seen = [[None] * (n + 1) for _ in range(n)]
+    col_seen = [[None] * (n + 1) for _ in range(n)]
+    box_seen = [[None] * (n + 1) for _ in range(n)]
+    row_ok, col_ok, box_ok = [True] * n, [True] * n, [True] * n
+    conflicts = set()
+    for k, v in enumerate(cells):
+        if v == 0:
+            continue
+        i, j = divmod(k, n)
+        b = (i // r) * (n // c) + j // c
+        for seen, ok, unit in ((row_seen, row_ok, i), (col_seen, col_ok, j), (box_seen, box_ok, b)):
+            first = seen[unit][v]
+            if first is None:
+                seen[unit][v] = (i, j)
+            else:
+                ok[unit] = False
+                conflicts.add(first)
+                conflicts.add((i, j))
+    if not conflicts:
+        return ("", True, [])
+    for i in range(n):
+        for j in range(n):
+            a, b, bx = row_ok[i], col_ok[j], box_ok[(i // r) * (n // c) + j // c]
+            if not (a and b and bx):
+                return (conflict_message(a, b, bx), False, sorted(conflicts))
+
+def validate(matrix, n, r, c):
+    return validate_cells([v for row in matrix for v in row], n, r, c)
 
 def input_valid(matrix,n,r,c):
-    for i in range(0, n):
-        for j in range(0, n):
-            msg,check = isValid(matrix, i, j, n, r, c)
-            if (not check):
-                return (msg,False)
-    return (msg,True)
+    msg, check, _ = validate(matrix, n, r, c)
+    return (msg, check)
 
-def solve_sudoku(board,n,r,c):
+def solve_sudoku(board,n,r,c,stats=None,depth=0,deadline=None):
+    # deadline is a time.monotonic() value; past it the search raises TimeoutError
+    if deadline is not None and time.monotonic() > deadline: raise TimeoutError
+    if stats is not None: stats.enter(depth)
     empty = find_empty(board,n)
     if not empty:  
         return True
     for nums in range(n):
+        if stats is not None: stats.candidate_checks += 1
         if valid(board, empty, nums + 1, n, r, c):
             board[empty[0]][empty[1]] = nums + 1
-            if solve_sudoku(board, n, r, c): 
+            if solve_sudoku(board, n, r, c, stats, depth + 1, deadline): 
                 return True
             board[empty[0]][empty[1]] = 0 
+            if stats is not None: stats.backtracks += 1
     return False
@@ -0,0 +1,44 @@
+import time
+from contextlib import contextmanager, nullcontext
+
+class SolverStats:
+    """Opt-in counters filled in by the solvers when passed as stats=.
+
+    nodes counts search nodes expanded, backtracks counts branches that
+    failed, candidate_checks counts candidate tests (valid() calls for the
+    backtracker, candidate-mask evaluations for the bitmask engine, rows
+    tried for Dancing Links), and timings holds wall time per phase.
+    """
+
+    def __init__(self):
+        self.nodes = 0
+        self.backtracks = 0
+        self.max_depth = 0
+        self.candidate_checks = 0
+        self.timings = {}
+
+    def enter(self, depth):
+        self.nodes += 1
+        if depth > self.max_depth:
+            self.max_depth = depth
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = self.timings.get(name, 0.0) + time.perf_counter() - start
+
+    def as_dict(self):
+        return {
+            'nodes': self.nodes,
+            'backtracks': self.backtracks,
+            'max_depth': self.max_depth,
+            'candidate_checks': self.candidate_checks,
+            'timings_ms': {name: round(t * 1000, 3) for name, t in self.timings.items()},
+        }
+
+def timed(stats, name):
+    """stats.phase(name), or a no-op context when stats is None."""
+    return nullcontext() if stats is None else stats.phase(name)